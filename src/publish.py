@@ -1,38 +1,81 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import hashlib
+import json
+import os
+import queue
+import selectors
+import socket
+import stat
+import struct
 import sys
+import tempfile
 import time
-from dataclasses import dataclass
-from threading import Event
-from urllib.parse import urlparse
+from dataclasses import dataclass, replace
+from threading import Thread
+from typing import Callable
 
 import paho.mqtt.client as mqtt
 
-try:
-    import tkinter as tk
-    from tkinter import messagebox
-except ModuleNotFoundError:
-    tk = None
-    messagebox = None
-
-
-TOPIC_BPM = "bhaptics/bpm"
-TOPIC_RUN = "bhaptics/run"
+from publish_core import (
+    CONNECT_TIMEOUT_S,
+    PUBLISH_TIMEOUT_S,
+    RECONNECT_MAX_DELAY_S,
+    RECONNECT_MIN_DELAY_S,
+    TOPIC_BPM,
+    TOPIC_RUN,
+    BrokerConfig,
+    _connect_client,
+    _connection_state,
+    _drain_publishes,
+    _loop_once,
+    _open_unthreaded,
+    _parse_broker,
+    _publish_once,
+    _publish_value,
+    _resolve_run_payload,
+    _topic_qos,
+)
+
+# tkinter is imported lazily by _ensure_tk() so headless runs skip the Tk import.
+tk = None
+messagebox = None
+
+
+DAEMON_SOCKET_PREFIX = "mypyhaptics"
+DAEMON_REQUEST_TIMEOUT_S = 10.0
+DAEMON_SELECT_STEP_S = 1.0
+# Sent before anything is published, so the caller may publish directly.
+DAEMON_REPLY_NOT_CONNECTED = "error: not connected to broker"
 ACK_START_ACCEPTED = "0"
 ACK_START_REJECTED_LATE = "-1"
 ACK_TOPICS_ALL = ("bhaptics/ack1", "bhaptics/ack2")
 
 
-@dataclass(frozen=True)
-class BrokerConfig:
-    host: str
-    port: int
-    keepalive: int
-    qos: int
-    retain: bool
-    username: str | None
-    password: str | None
+@dataclass(frozen=True, slots=True)
+class QueuedPublish:
+    topic: str
+    value: int
+    status: str
+    error_title: str
+    # Undoes the UI state the press applied when it was queued.
+    on_failed: Callable[[], None] | None = None
+    # Set for a delayed start: the worker resolves the target only once the
+    # broker is connected, so a reconnect cannot eat into the delay.
+    delay_s: float | None = None
+
+
+def _describe_publish(item: QueuedPublish) -> str:
+    if item.delay_s is not None:
+        return f"{item.topic} (delay_s={item.delay_s:g})"
+    return f"{item.topic}={item.value}"
+
+
+def _is_bpm_text(text: str) -> bool:
+    # isascii() keeps out digits such as "²" that isdigit() accepts but int() rejects.
+    return text == "" or (text.isascii() and text.isdigit())
 
 
 class PublishUI:
@@ -45,11 +88,17 @@ class PublishUI:
         self.root = root
         self.client = client
         self.config = config
-        self.status_var = tk.StringVar(value="ready")
         self.bpm_var = tk.StringVar(value="120")
         self.delay_var = tk.StringVar(value="3")
+        self._bpm_int = 120
+        self.bpm_var.trace_add("write", self._on_bpm_changed)
         self.run_active = False
+        self._status_text = "ready"
+        self._status_scheduled = False
+        self._outbox: queue.Queue[QueuedPublish] = queue.Queue()
         self._build_layout()
+        self._worker = Thread(target=self._drain_outbox, daemon=True)
+        self._worker.start()
 
     def _build_layout(self) -> None:
         self.root.title("myPyHaptics Publisher")
@@ -60,7 +109,15 @@ class PublishUI:
         frame.pack(fill=tk.BOTH, expand=True)
 
         tk.Label(frame, text="BPM").grid(row=0, column=0, sticky="w")
-        tk.Entry(frame, textvariable=self.bpm_var, width=10, justify="right").grid(
+        validate_bpm = (self.root.register(_is_bpm_text), "%P")
+        tk.Entry(
+            frame,
+            textvariable=self.bpm_var,
+            width=10,
+            justify="right",
+            validate="key",
+            validatecommand=validate_bpm,
+        ).grid(
             row=0,
             column=1,
             sticky="w",
@@ -86,18 +143,119 @@ class PublishUI:
         )
 
         tk.Label(frame, text="Status").grid(row=3, column=0, sticky="nw", pady=(14, 0))
-        tk.Label(
+        # Configured directly; nothing reads the status back, so no StringVar.
+        self._status_label = tk.Label(
             frame,
-            textvariable=self.status_var,
+            text="ready",
             justify="left",
             anchor="w",
             wraplength=380,
-        ).grid(row=3, column=1, columnspan=2, sticky="w", pady=(14, 0))
+        )
+        self._status_label.grid(row=3, column=1, columnspan=2, sticky="w", pady=(14, 0))
 
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
+    def _on_bpm_changed(self, *_args: object) -> None:
+        # The entry only accepts digits, so the text is always parseable.
+        text = self.bpm_var.get()
+        self._bpm_int = int(text) if text else 0
+
     def _set_status(self, message: str) -> None:
-        self.status_var.set(message)
+        # A burst of updates redraws once, with the latest text, when Tk idles.
+        self._status_text = message
+        if not self._status_scheduled:
+            self._status_scheduled = True
+            self.root.after_idle(self._flush_status)
+
+    def _flush_status(self) -> None:
+        self._status_scheduled = False
+        self._status_label.config(text=self._status_text)
+
+    def _queue_publish(self, item: QueuedPublish) -> None:
+        # Button callbacks return immediately; the worker thread owns the
+        # broker round-trip so a slow network never freezes the Tk loop.
+        self._outbox.put(item)
+
+    def _post_to_ui(self, callback: Callable[..., None], *args: object) -> None:
+        # The root may already be gone while the worker finishes a batch.
+        with contextlib.suppress(RuntimeError, tk.TclError):
+            self.root.after(0, callback, *args)
+
+    def _drain_outbox(self) -> None:
+        while True:
+            # Presses queued while the previous batch was in flight go out
+            # together and share a single wait for broker confirmation.
+            items = [self._outbox.get()]
+            with contextlib.suppress(queue.Empty):
+                while True:
+                    items.append(self._outbox.get_nowait())
+
+            sent: list[tuple[QueuedPublish, mqtt.MQTTMessageInfo]] = []
+            send_failure: tuple[QueuedPublish, str] | None = None
+            dropped: list[QueuedPublish] = []
+            for index, item in enumerate(items):
+                try:
+                    item = self._resolve_item(item)
+                    qos = _topic_qos(self.config, item.topic)
+                    info = _publish_value(
+                        self.client, item.topic, item.value, qos, self.config.retain
+                    )
+                except Exception as exc:
+                    # Later presses are dropped rather than sent out of order.
+                    send_failure = (item, str(exc))
+                    dropped = items[index + 1 :]
+                    break
+                sent.append((item, info))
+
+            published: list[QueuedPublish] = []
+            failures: list[tuple[QueuedPublish, str]] = []
+            deadline = time.monotonic() + PUBLISH_TIMEOUT_S
+            for item, info in sent:
+                try:
+                    remaining = max(0.0, deadline - time.monotonic())
+                    _drain_publishes([(item.topic, info)], timeout=remaining)
+                except Exception as exc:
+                    failures.append((item, str(exc)))
+                    continue
+                published.append(item)
+            if send_failure is not None:
+                failures.append(send_failure)
+            self._post_to_ui(self._on_batch_done, published, failures, dropped)
+
+    def _resolve_item(self, item: QueuedPublish) -> QueuedPublish:
+        if item.delay_s is None:
+            return item
+        if not _connection_state(self.client).connected.wait(timeout=CONNECT_TIMEOUT_S):
+            raise RuntimeError(f"failed to publish {item.topic}: not connected to broker")
+        payload = _resolve_run_payload(delay_sec=item.delay_s)
+        return replace(
+            item,
+            value=payload,
+            status=f"published {TOPIC_RUN} target_ts_ms={payload} (delay_s={item.delay_s:g})",
+        )
+
+    def _on_batch_done(
+        self,
+        published: list[QueuedPublish],
+        failures: list[tuple[QueuedPublish, str]],
+        dropped: list[QueuedPublish],
+    ) -> None:
+        # Undo newest first, so each press restores the state it replaced.
+        for item in reversed([*(item for item, _error in failures), *dropped]):
+            if item.on_failed is not None:
+                item.on_failed()
+        if not failures:
+            self._set_status(published[-1].status)
+            return
+        errors = [error for _item, error in failures]
+        if dropped:
+            # Dropped presses follow the send failure, the last entry.
+            not_sent = ", ".join(_describe_publish(item) for item in dropped)
+            errors[-1] = f"{errors[-1]} (not sent: {not_sent})"
+        self._set_status(f"failed to publish: {'; '.join(errors)}")
+        if messagebox is not None:
+            for (item, _error), error in zip(failures, errors):
+                messagebox.showerror(item.error_title, error)
 
     def handle_ack(self, topic: str, payload: str) -> None:
         if payload == ACK_START_REJECTED_LATE:
@@ -112,11 +270,17 @@ class PublishUI:
         try:
             if self.run_active:
                 raise ValueError("cannot change BPM while run is active; stop first")
-            bpm = int(self.bpm_var.get().strip())
+            bpm = self._bpm_int
             if bpm <= 0:
                 raise ValueError("bpm must be positive")
-            _publish_value(self.client, TOPIC_BPM, bpm, self.config.qos, self.config.retain)
-            self._set_status(f"published {TOPIC_BPM}={bpm}")
+            self._queue_publish(
+                QueuedPublish(
+                    topic=TOPIC_BPM,
+                    value=bpm,
+                    status=f"published {TOPIC_BPM}={bpm}",
+                    error_title="Publish BPM failed",
+                )
+            )
         except Exception as exc:
             self._set_status(f"failed to publish bpm: {exc}")
             if messagebox is not None:
@@ -125,13 +289,29 @@ class PublishUI:
     def _publish_start(self, delay_sec: float) -> None:
         if self.run_active:
             raise ValueError("run is already active; stop first")
-        payload = _resolve_run_payload(delay_sec=delay_sec)
-        _publish_value(self.client, TOPIC_RUN, payload, self.config.qos, self.config.retain)
-        self.run_active = True
-        self._set_status(
-            f"published {TOPIC_RUN} target_ts_ms={payload} (delay_s={delay_sec:g})"
+        self._queue_publish(
+            QueuedPublish(
+                topic=TOPIC_RUN,
+                value=0,
+                status=f"publishing {TOPIC_RUN} (delay_s={delay_sec:g})",
+                error_title="Delayed Start failed",
+                on_failed=self._set_run_active(True),
+                delay_s=delay_sec,
+            )
         )
 
+    def _set_run_active(self, active: bool) -> Callable[[], None]:
+        # The run state changes when the press is queued, so a second Start
+        # or a BPM change cannot slip past the guards while a start is still
+        # in flight. The returned callback restores the previous state.
+        previous = self.run_active
+        self.run_active = active
+
+        def restore() -> None:
+            self.run_active = previous
+
+        return restore
+
     def _publish_target_start(self) -> None:
         try:
             delay_sec = float(self.delay_var.get().strip())
@@ -145,9 +325,15 @@ class PublishUI:
 
     def _stop(self) -> None:
         try:
-            _publish_value(self.client, TOPIC_RUN, 0, self.config.qos, self.config.retain)
-            self.run_active = False
-            self._set_status(f"published {TOPIC_RUN}=0")
+            self._queue_publish(
+                QueuedPublish(
+                    topic=TOPIC_RUN,
+                    value=0,
+                    status=f"published {TOPIC_RUN}=0",
+                    error_title="Stop failed",
+                    on_failed=self._set_run_active(False),
+                )
+            )
         except Exception as exc:
             self._set_status(f"failed to publish stop: {exc}")
             if messagebox is not None:
@@ -157,24 +343,21 @@ class PublishUI:
         self.root.destroy()
 
 
-def _parse_broker(value: str, fallback_port: int) -> tuple[str, int]:
-    raw = value.strip()
-    if not raw:
-        raise ValueError("broker must not be empty")
-
-    if "://" in raw:
-        parsed = urlparse(raw)
-        host = parsed.hostname
-        port = parsed.port or fallback_port
-    else:
-        parsed = urlparse(f"mqtt://{raw}")
-        host = parsed.hostname
-        port = parsed.port or fallback_port
+_PARSER: argparse.ArgumentParser | None = None
 
-    if not host:
-        raise ValueError(f"invalid broker value: {value!r}")
 
-    return host, port
+def _ensure_tk() -> bool:
+    global tk, messagebox
+    if tk is not None:
+        return True
+    try:
+        import tkinter
+        from tkinter import messagebox as tk_messagebox
+    except ModuleNotFoundError:
+        return False
+    tk = tkinter
+    messagebox = tk_messagebox
+    return True
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -203,7 +386,14 @@ def _build_parser() -> argparse.ArgumentParser:
         type=int,
         choices=[0, 1, 2],
         default=1,
-        help="MQTT QoS level (default: 1)",
+        help="MQTT QoS level for run commands and ACK subscriptions (default: 1)",
+    )
+    parser.add_argument(
+        "--qos-bpm",
+        type=int,
+        choices=[0, 1, 2],
+        default=None,
+        help="MQTT QoS level for BPM updates (default: 0 in the UI, --qos otherwise)",
     )
     parser.add_argument(
         "--retain",
@@ -235,102 +425,426 @@ def _build_parser() -> argparse.ArgumentParser:
         choices=[0, 1],
         help="Run command (0=stop, 1=start using --delay-s target timestamp payload)",
     )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=None,
+        help="Burst mode: publish --bpm N times (cycling through bpm..bpm+19)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help="Burst mode publish rate in Hz (default: as fast as possible)",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help=(
+            "Keep one MQTT connection open and publish requests from later "
+            "headless invocations (Unix only)"
+        ),
+    )
     return parser
 
 
-def _connect_client(config: BrokerConfig) -> mqtt.Client:
-    connected = Event()
-    connect_error: list[str] = []
-
-    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
-
-    if config.username:
-        client.username_pw_set(config.username, config.password)
-
-    def _connect_ok(reason_code: object) -> bool:
-        if reason_code == 0:
-            return True
-
-        is_failure = getattr(reason_code, "is_failure", None)
-        if isinstance(is_failure, bool):
-            return not is_failure
-        if callable(is_failure):
-            try:
-                return not bool(is_failure())
-            except TypeError:
-                pass
-
-        code_value = getattr(reason_code, "value", None)
-        if isinstance(code_value, int):
-            return code_value == 0
-
-        return str(reason_code).strip().lower() in {"success", "0"}
-
-    def _reason_code_text(reason_code: object) -> str:
-        code_value = getattr(reason_code, "value", None)
-        if isinstance(code_value, int):
-            return f"{reason_code} (code={code_value})"
-        return str(reason_code)
-
-    def on_connect(
-        _client: mqtt.Client,
-        _userdata: object,
-        _flags: dict[str, int],
-        reason_code: object,
-        _properties: mqtt.Properties | None = None,
-    ) -> None:
-        if _connect_ok(reason_code):
-            connected.set()
-            return
-        connect_error.append(f"MQTT connect failed: {_reason_code_text(reason_code)}")
-        connected.set()
+def _get_parser() -> argparse.ArgumentParser:
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = _build_parser()
+    return _PARSER
 
-    client.on_connect = on_connect
-    client.connect(config.host, config.port, config.keepalive)
-    client.loop_start()
 
-    if not connected.wait(timeout=5):
-        client.loop_stop()
+def _publish_burst(
+    config: BrokerConfig,
+    bpm: int,
+    count: int,
+    rate: float | None,
+) -> float:
+    # Exercises the batched path: no per-message wait, the network loop is
+    # pumped between sends (instead of sleeping) and confirmed once at the end.
+    client = _open_unthreaded(config)
+    try:
+        interval = 1.0 / rate if rate else 0.0
+        started = time.monotonic()
+        infos: list[tuple[str, mqtt.MQTTMessageInfo]] = []
+        for index in range(count):
+            while True:
+                remaining = started + index * interval - time.monotonic()
+                rc = client.loop(timeout=max(0.0, remaining))
+                if rc != mqtt.MQTT_ERR_SUCCESS:
+                    raise ConnectionError(f"MQTT connection lost: {mqtt.error_string(rc)}")
+                if remaining <= 0:
+                    break
+            infos.append(
+                (
+                    TOPIC_BPM,
+                    _publish_value(
+                        client, TOPIC_BPM, bpm + index % 20, config.qos_bpm, config.retain
+                    ),
+                )
+            )
+        deadline = time.monotonic() + PUBLISH_TIMEOUT_S
+        while not all(info.is_published() for _topic, info in infos):
+            _loop_once(client, deadline, "publish confirmation")
+        return time.monotonic() - started
+    finally:
         client.disconnect()
-        raise TimeoutError("timeout waiting for MQTT connection")
 
-    if connect_error:
-        client.loop_stop()
-        client.disconnect()
-        raise ConnectionError(connect_error[0])
 
-    return client
+def _build_cli_items(args: argparse.Namespace) -> list[tuple[str, int]]:
+    items: list[tuple[str, int]] = []
+    if args.bpm is not None:
+        items.append((TOPIC_BPM, args.bpm))
+
+    should_publish_start = (args.run == 1) or (args.run is None and args.delay_s is not None)
+    if args.run == 0:
+        items.append((TOPIC_RUN, 0))
+    elif should_publish_start:
+        if args.delay_s is None:
+            raise ValueError("delay_s is required for start")
+        items.append((TOPIC_RUN, _resolve_run_payload(delay_sec=args.delay_s)))
+    return items
+
+
+def _print_published(items: list[tuple[str, int]], delay_s: float | None) -> None:
+    for topic, value in items:
+        if topic == TOPIC_RUN and value != 0:
+            print(f"published {TOPIC_RUN} target_ts_ms={value} (delay_s={delay_s:g})")
+        else:
+            print(f"published {topic}={value}")
+
+
+def _daemon_supported() -> bool:
+    return hasattr(socket, "AF_UNIX")
+
+
+def _daemon_runtime_dir(create: bool = False) -> str:
+    # A filesystem socket in a directory only this user can enter; an
+    # abstract socket would have no permissions at all. Only the daemon
+    # creates the directory; a CLI run that finds none has no daemon to use.
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return runtime_dir
+    runtime_dir = os.path.join(tempfile.gettempdir(), f"mypyhaptics-{os.getuid()}")
+    if create:
+        os.makedirs(runtime_dir, mode=0o700, exist_ok=True)
+    elif not os.path.lexists(runtime_dir):
+        return runtime_dir
+    info = os.lstat(runtime_dir)
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or info.st_mode & (stat.S_IRWXG | stat.S_IRWXO)
+    ):
+        raise RuntimeError(f"unsafe daemon directory {runtime_dir!r}")
+    return runtime_dir
+
+
+def _daemon_identity(config: BrokerConfig) -> dict[str, str | None]:
+    # A request is only served by a daemon holding the same broker and the
+    # same credentials; the password travels as a digest.
+    auth = None
+    if config.username:
+        secret = f"{config.username}\0{config.password or ''}".encode("utf-8")
+        auth = hashlib.sha256(secret).hexdigest()
+    return {"broker": f"{config.host}:{config.port}", "auth": auth}
+
+
+def _daemon_address(config: BrokerConfig, create: bool = False) -> str:
+    # One socket per broker and credentials, so a CLI run with a different
+    # identity finds no daemon and connects directly instead of being refused.
+    identity = _daemon_identity(config)
+    key = f"{identity['broker']}\0{identity['auth'] or ''}".encode("utf-8")
+    name = f"{DAEMON_SOCKET_PREFIX}-{hashlib.sha256(key).hexdigest()[:16]}.sock"
+    return os.path.join(_daemon_runtime_dir(create), name)
+
+
+def _peer_is_same_user(conn: socket.socket) -> bool:
+    if not hasattr(socket, "SO_PEERCRED"):
+        # The 0700 directory and 0600 socket still keep other users out.
+        return True
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _pid, uid, _gid = struct.unpack("3i", creds)
+    return uid == os.getuid()
+
+
+def _try_daemon_publish(config: BrokerConfig, command: dict[str, object]) -> str | None:
+    # None when no daemon could be reached, or when it answered that it is
+    # not connected and so published nothing. Otherwise a missing reply is
+    # an error: the daemon may already have published, so falling back
+    # could send a run start twice.
+    if not _daemon_supported():
+        return None
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(DAEMON_REQUEST_TIMEOUT_S)
+        try:
+            sock.connect(_daemon_address(config))
+        except (OSError, RuntimeError):
+            return None
+        try:
+            sock.sendall(json.dumps(command).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                reply = reader.readline()
+        except OSError as exc:
+            return f"error: no reply: {exc}"
+    if not reply:
+        return "error: connection closed without a reply"
+    reply_text = reply.decode("utf-8", errors="replace").strip()
+    if reply_text == DAEMON_REPLY_NOT_CONNECTED:
+        return None
+    return reply_text
+
+
+@dataclass(slots=True)
+class PendingReply:
+    conn: socket.socket
+    items: list[tuple[str, int]]
+    infos: list[tuple[str, mqtt.MQTTMessageInfo]]
+    deadline: float
+
+
+def _parse_daemon_command(
+    config: BrokerConfig,
+    line: bytes,
+) -> tuple[list[tuple[str, int]], BrokerConfig]:
+    command = json.loads(line)
+    identity = _daemon_identity(config)
+    if command.get("broker") != identity["broker"]:
+        raise ValueError(f"daemon is connected to {identity['broker']}")
+    if command.get("auth") != identity["auth"]:
+        raise ValueError("daemon is connected with different credentials")
+
+    items: list[tuple[str, int]] = []
+    if "bpm" in command:
+        items.append((TOPIC_BPM, int(command["bpm"])))
+    if "run" in command:
+        items.append((TOPIC_RUN, int(command["run"])))
+    if not items:
+        raise ValueError("empty publish request")
+
+    request_config = replace(
+        config,
+        qos_bpm=int(command.get("qos_bpm", config.qos_bpm)),
+        qos_run=int(command.get("qos_run", config.qos_run)),
+        retain=bool(command.get("retain", config.retain)),
+    )
+    return items, request_config
 
 
-def _publish_value(
+def _handle_daemon_command(
     client: mqtt.Client,
-    topic: str,
-    value: int,
-    qos: int,
-    retain: bool,
-) -> None:
-    payload = str(value)
-    info = client.publish(topic, payload=payload, qos=qos, retain=retain)
-    info.wait_for_publish(timeout=5)
-    if info.rc != mqtt.MQTT_ERR_SUCCESS:
-        raise RuntimeError(f"failed to publish {topic}: rc={info.rc}")
-
-
-def _resolve_run_payload(delay_sec: float) -> int:
-    now_ms = int(time.time() * 1000)
-    base_ms = (now_ms // 1000) * 1000
-    return base_ms + int(delay_sec * 1000)
+    config: BrokerConfig,
+    conn: socket.socket,
+    line: bytes,
+) -> PendingReply | None:
+    # Publishes are queued without waiting; the select loop reports back to
+    # the caller once every handle has been confirmed.
+    try:
+        items, request_config = _parse_daemon_command(config, line)
+        if not _connection_state(client).connected.is_set():
+            _send_daemon_reply(conn, DAEMON_REPLY_NOT_CONNECTED)
+            return None
+        infos = [
+            (
+                topic,
+                _publish_value(
+                    client, topic, value, _topic_qos(request_config, topic), request_config.retain
+                ),
+            )
+            for topic, value in items
+        ]
+    except Exception as exc:
+        _send_daemon_reply(conn, f"error: {exc}")
+        return None
+    return PendingReply(conn, items, infos, time.monotonic() + PUBLISH_TIMEOUT_S)
+
+
+def _send_daemon_reply(conn: socket.socket, reply: str) -> None:
+    if reply != "ok":
+        print(f"daemon request {reply}", file=sys.stderr)
+    with contextlib.suppress(OSError):
+        conn.setblocking(True)
+        conn.sendall(reply.encode("utf-8") + b"\n")
+    conn.close()
+
+
+def _settle_daemon_replies(pending: list[PendingReply]) -> list[PendingReply]:
+    waiting: list[PendingReply] = []
+    now = time.monotonic()
+    for request in pending:
+        failed = [
+            (topic, info) for topic, info in request.infos
+            if info.rc != mqtt.MQTT_ERR_SUCCESS
+        ]
+        if failed:
+            topic, info = failed[0]
+            _send_daemon_reply(request.conn, f"error: failed to publish {topic}: rc={info.rc}")
+        elif all(info.is_published() for _topic, info in request.infos):
+            for topic, value in request.items:
+                print(f"published {topic}={value}")
+            _send_daemon_reply(request.conn, "ok")
+        elif now >= request.deadline:
+            _send_daemon_reply(request.conn, "error: timeout waiting for publish confirmation")
+        else:
+            waiting.append(request)
+    return waiting
+
+
+def _run_daemon(config: BrokerConfig) -> int:
+    # A single select loop serves both the local request socket and the broker
+    # socket, so the daemon never starts paho's network thread.
+    address = _daemon_address(config, create=True)
+    client = _open_unthreaded(config)
+    connected = _connection_state(client).connected
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    selector = selectors.DefaultSelector()
+    pending: list[PendingReply] = []
+    broker_sock: object | None = None
+    broker_events = 0
+    reconnect_at = 0.0
+    reconnect_delay = RECONNECT_MIN_DELAY_S
+    bound = False
+    try:
+        if os.path.exists(address):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(address)
+                except OSError:
+                    os.unlink(address)  # left behind by a daemon that died
+                else:
+                    raise RuntimeError(f"a publish daemon is already listening on {address}")
+        # Create the socket file 0600 from the start, not chmod it afterwards.
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(address)
+        finally:
+            os.umask(old_umask)
+        bound = True
+        server.listen()
+        server.setblocking(False)
+        selector.register(server, selectors.EVENT_READ, data=None)
+        print(f"publish daemon listening on {address!r} (broker {config.host}:{config.port})")
+
+        while True:
+            sock = client.socket()
+            if sock is not broker_sock:
+                if broker_events:
+                    with contextlib.suppress(KeyError, ValueError):
+                        selector.unregister(broker_sock)
+                broker_sock, broker_events = sock, 0
+            if sock is None:
+                now = time.monotonic()
+                if now >= reconnect_at:
+                    reconnect_at = now + reconnect_delay
+                    try:
+                        client.reconnect()
+                    except OSError as exc:
+                        print(f"daemon reconnect failed: {exc}", file=sys.stderr)
+                    # reconnect() returning only means the TCP connect
+                    # worked; the delay resets once a CONNACK is accepted.
+                    reconnect_delay = min(reconnect_delay * 2, RECONNECT_MAX_DELAY_S)
+                    continue
+            else:
+                if connected.is_set():
+                    reconnect_delay = RECONNECT_MIN_DELAY_S
+                events = selectors.EVENT_READ
+                if client.want_write():
+                    events |= selectors.EVENT_WRITE
+                if events != broker_events:
+                    if broker_events:
+                        selector.modify(sock, events, data=client)
+                    else:
+                        selector.register(sock, events, data=client)
+                    broker_events = events
+
+            timeout = DAEMON_SELECT_STEP_S
+            if sock is None:
+                timeout = min(timeout, max(0.0, reconnect_at - time.monotonic()))
+            for key, events in selector.select(timeout=timeout):
+                if key.data is client:
+                    if events & selectors.EVENT_READ:
+                        client.loop_read()
+                    if events & selectors.EVENT_WRITE and client.socket() is sock:
+                        client.loop_write()
+                    continue
+                if key.data is None:
+                    conn, _addr = server.accept()
+                    if not _peer_is_same_user(conn):
+                        print("daemon rejected a request from another user", file=sys.stderr)
+                        conn.close()
+                        continue
+                    conn.setblocking(False)
+                    selector.register(conn, selectors.EVENT_READ, data=bytearray())
+                    continue
+
+                conn = key.fileobj
+                buffer = key.data
+                try:
+                    chunk = conn.recv(4096)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    chunk = b""
+                if chunk:
+                    buffer.extend(chunk)
+                    if b"\n" not in buffer:
+                        continue
+                selector.unregister(conn)
+                if not chunk:
+                    conn.close()
+                    continue
+                line = bytes(buffer.split(b"\n", 1)[0])
+                request = _handle_daemon_command(client, config, conn, line)
+                if request is not None:
+                    pending.append(request)
+
+            client.loop_misc()
+            if pending:
+                pending = _settle_daemon_replies(pending)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        for request in pending:
+            request.conn.close()
+        for key in list(selector.get_map().values()):
+            if key.fileobj is not server and key.data is not client:
+                key.fileobj.close()
+        selector.close()
+        server.close()
+        if bound:
+            with contextlib.suppress(OSError):
+                os.unlink(address)
+        client.disconnect()
 
 
 def main() -> int:
-    parser = _build_parser()
+    parser = _get_parser()
     args = parser.parse_args()
 
     has_cli_publish_args = (
         args.bpm is not None or args.run is not None or args.delay_s is not None
     )
-    launch_ui = (not args.headless) and (args.ui or not has_cli_publish_args)
-    if not launch_ui and not has_cli_publish_args:
+    if args.rate is not None and args.count is None:
+        parser.error("--rate requires --count")
+    if args.count is not None:
+        if args.count <= 0:
+            parser.error("--count must be a positive integer")
+        if args.rate is not None and args.rate <= 0:
+            parser.error("--rate must be > 0")
+        if args.bpm is None or args.run is not None or args.delay_s is not None:
+            parser.error("--count requires --bpm and cannot be combined with --run or --delay-s")
+        if args.ui or args.daemon:
+            parser.error("--count cannot be combined with --ui or --daemon")
+    if args.daemon:
+        if has_cli_publish_args or args.ui:
+            parser.error("--daemon cannot be combined with --ui, --bpm, --run, or --delay-s")
+        if not _daemon_supported():
+            parser.error("--daemon is not supported on this platform")
+    launch_ui = (not args.headless) and (not args.daemon) and (
+        args.ui or not has_cli_publish_args
+    )
+    if not launch_ui and not args.daemon and not has_cli_publish_args:
         parser.error("at least one of --bpm, --run, or --delay-s is required in headless mode")
     if args.bpm is not None and args.bpm <= 0:
         parser.error("--bpm must be a positive integer")
@@ -340,8 +854,18 @@ def main() -> int:
         parser.error("--delay-s cannot be used with --run 0")
     if args.run == 1 and args.delay_s is None:
         parser.error("--delay-s is required with --run 1")
+    if launch_ui and not _ensure_tk():
+        if not has_cli_publish_args:
+            print("error: tkinter is not available", file=sys.stderr)
+            return 1
+        print("warning: tkinter is not available, falling back to headless mode")
+        launch_ui = False
+
     host, port = _parse_broker(args.broker, args.port)
     ack_topics = ACK_TOPICS_ALL
+    qos_bpm = args.qos_bpm
+    if qos_bpm is None:
+        qos_bpm = 0 if launch_ui else args.qos
     config = BrokerConfig(
         host=host,
         port=port,
@@ -350,76 +874,102 @@ def main() -> int:
         retain=args.retain,
         username=args.username,
         password=args.password,
+        qos_bpm=qos_bpm,
+        qos_run=args.qos,
     )
 
+    if args.daemon:
+        try:
+            return _run_daemon(config)
+        except Exception as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+
+    if args.count is not None:
+        try:
+            elapsed = _publish_burst(config, args.bpm, args.count, args.rate)
+        except Exception as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        rate = args.count / elapsed if elapsed > 0 else float("inf")
+        print(f"published {args.count} x {TOPIC_BPM} in {elapsed:.3f}s ({rate:.0f} msg/s)")
+        return 0
+
+    if not launch_ui:
+        items = _build_cli_items(args)
+        command: dict[str, object] = {
+            **_daemon_identity(config),
+            "qos_bpm": config.qos_bpm,
+            "qos_run": config.qos_run,
+            "retain": config.retain,
+        }
+        for topic, value in items:
+            command["bpm" if topic == TOPIC_BPM else "run"] = value
+        reply = _try_daemon_publish(config, command)
+        if reply == "ok":
+            _print_published(items, args.delay_s)
+            return 0
+        if reply is not None:
+            print(f"publish daemon {reply}", file=sys.stderr)
+            return 1
+
+        try:
+            items = _publish_once(config, lambda: _build_cli_items(args))
+        except Exception as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        _print_published(items, args.delay_s)
+        return 0
+
     client: mqtt.Client | None = None
     try:
         client = _connect_client(config)
+        root = tk.Tk()
+        ui = PublishUI(
+            root=root,
+            client=client,
+            config=config,
+        )
 
-        if launch_ui:
-            if tk is None:
-                if has_cli_publish_args:
-                    print("warning: tkinter is not available, falling back to headless mode")
-                else:
-                    raise RuntimeError("tkinter is not available")
-            else:
-                root = tk.Tk()
-                ui = PublishUI(
-                    root=root,
-                    client=client,
-                    config=config,
-                )
-
-                def on_message(
-                    _client: mqtt.Client,
-                    _userdata: object,
-                    msg: mqtt.MQTTMessage,
-                ) -> None:
-                    if msg.topic not in ACK_TOPICS_ALL:
-                        return
-                    payload = msg.payload.decode("utf-8", errors="ignore").strip()
-                    if root.winfo_exists():
-                        root.after(0, ui.handle_ack, msg.topic, payload)
-
-                client.on_message = on_message
-                subscribe_result, _mid = client.subscribe(
-                    [(topic, config.qos) for topic in ack_topics]
-                )
-                if subscribe_result != mqtt.MQTT_ERR_SUCCESS:
-                    ui._set_status(
-                        "failed to subscribe ACK topics "
-                        f"{', '.join(ack_topics)}: rc={subscribe_result}"
-                    )
-                else:
-                    ui._set_status(f"listening for ACK on {', '.join(ack_topics)}")
-                root.mainloop()
-                return 0
-
-        if args.bpm is not None:
-            _publish_value(client, TOPIC_BPM, args.bpm, config.qos, config.retain)
-            print(f"published {TOPIC_BPM}={args.bpm}")
-
-        should_publish_start = (args.run == 1) or (args.run is None and args.delay_s is not None)
-        if args.run == 0:
-            run_payload = 0
-            _publish_value(client, TOPIC_RUN, run_payload, config.qos, config.retain)
-            print(f"published {TOPIC_RUN}=0")
-        elif should_publish_start:
-            if args.delay_s is None:
-                raise ValueError("delay_s is required for start")
-            run_payload = _resolve_run_payload(delay_sec=args.delay_s)
-            _publish_value(client, TOPIC_RUN, run_payload, config.qos, config.retain)
-            print(
-                f"published {TOPIC_RUN} target_ts_ms={run_payload} "
-                f"(delay_s={args.delay_s:g})"
+        def on_message(
+            _client: mqtt.Client,
+            _userdata: object,
+            msg: mqtt.MQTTMessage,
+        ) -> None:
+            if msg.topic not in ACK_TOPICS_ALL:
+                return
+            payload = msg.payload.decode("utf-8", errors="ignore").strip()
+            if root.winfo_exists():
+                root.after(0, ui.handle_ack, msg.topic, payload)
+
+        client.on_message = on_message
+        subscribe_result, _mid = client.subscribe(
+            [(topic, config.qos) for topic in ack_topics]
+        )
+        if subscribe_result != mqtt.MQTT_ERR_SUCCESS:
+            ui._set_status(
+                "failed to subscribe ACK topics "
+                f"{', '.join(ack_topics)}: rc={subscribe_result}"
             )
-
+        else:
+            ui._set_status(f"listening for ACK on {', '.join(ack_topics)}")
+
+        def on_connection_change(connected: bool, message: str) -> None:
+            if connected:
+                # Clean sessions lose subscriptions across reconnects.
+                client.subscribe([(topic, config.qos) for topic in ack_topics])
+            if root.winfo_exists():
+                root.after(0, ui._set_status, message)
+
+        _connection_state(client).listener = on_connection_change
+        root.mainloop()
         return 0
     except Exception as exc:
         print(f"error: {exc}", file=sys.stderr)
         return 1
     finally:
         if client is not None:
+            _connection_state(client).listener = None
             client.loop_stop()
             client.disconnect()
 
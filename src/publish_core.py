@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import socket
+import time
+from dataclasses import dataclass
+from threading import Event
+from typing import Callable
+from urllib.parse import urlparse
+
+import paho.mqtt.client as mqtt
+
+TOPIC_BPM = "bhaptics/bpm"
+TOPIC_RUN = "bhaptics/run"
+CONNECT_TIMEOUT_S = 5.0
+PUBLISH_TIMEOUT_S = 5.0
+CLI_LOOP_STEP_S = 0.1
+RECONNECT_MIN_DELAY_S = 1
+RECONNECT_MAX_DELAY_S = 30
+
+
+@dataclass(frozen=True, slots=True)
+class BrokerConfig:
+    host: str
+    port: int
+    keepalive: int
+    qos: int
+    retain: bool
+    username: str | None
+    password: str | None
+    # BPM updates are superseded by the next value; run commands are one-shot.
+    qos_bpm: int = 0
+    qos_run: int = 1
+
+
+def _parse_broker(value: str, fallback_port: int) -> tuple[str, int]:
+    raw = value.strip()
+    if not raw:
+        raise ValueError("broker must not be empty")
+
+    if "://" not in raw and not any(ch in raw for ch in "@/?#[]"):
+        # Fast path for the common bare "host" / "host:port" forms.
+        host, sep, port_text = raw.rpartition(":")
+        if not sep:
+            return raw.lower(), fallback_port
+        if host and ":" not in host and port_text.isascii() and port_text.isdigit():
+            port = int(port_text)
+            if port <= 65535:
+                return host.lower(), port or fallback_port
+
+    if "://" in raw:
+        parsed = urlparse(raw)
+        host = parsed.hostname
+        port = parsed.port or fallback_port
+    else:
+        parsed = urlparse(f"mqtt://{raw}")
+        host = parsed.hostname
+        port = parsed.port or fallback_port
+
+    if not host:
+        raise ValueError(f"invalid broker value: {value!r}")
+
+    return host, port
+
+
+def _connect_ok(reason_code: object) -> bool:
+    # CallbackAPIVersion.VERSION2 always reports a ReasonCode with an int value.
+    return getattr(reason_code, "value", reason_code) == 0
+
+
+def _reason_code_text(reason_code: object) -> str:
+    code_value = getattr(reason_code, "value", None)
+    if isinstance(code_value, int):
+        return f"{reason_code} (code={code_value})"
+    return str(reason_code)
+
+
+class ConnectionState:
+    def __init__(self) -> None:
+        self.connected = Event()
+        self.listener: Callable[[bool, str], None] | None = None
+
+    def update(self, connected: bool, message: str) -> None:
+        if connected:
+            self.connected.set()
+        else:
+            self.connected.clear()
+        listener = self.listener
+        if listener is not None:
+            listener(connected, message)
+
+
+def _connection_state(client: mqtt.Client) -> ConnectionState:
+    return client.user_data_get()
+
+
+def _tune_socket(_client: mqtt.Client, _userdata: object, sock: object) -> None:
+    # Control payloads are a few bytes; do not let Nagle hold them back.
+    # Runs for every (re)connect, and is skipped for non-TCP transports.
+    with contextlib.suppress(AttributeError, OSError):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+def _new_client(config: BrokerConfig) -> mqtt.Client:
+    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, userdata=ConnectionState())
+    client.on_socket_open = _tune_socket
+    if config.username:
+        client.username_pw_set(config.username, config.password)
+    return client
+
+
+def _connect_client(config: BrokerConfig) -> mqtt.Client:
+    connack_received = Event()
+    connect_error: list[str] = []
+
+    client = _new_client(config)
+    state = _connection_state(client)
+
+    def on_connect(
+        _client: mqtt.Client,
+        _userdata: object,
+        _flags: dict[str, int],
+        reason_code: object,
+        _properties: mqtt.Properties | None = None,
+    ) -> None:
+        if _connect_ok(reason_code):
+            state.update(True, f"connected to {config.host}:{config.port}")
+        elif not connack_received.is_set():
+            connect_error.append(f"MQTT connect failed: {_reason_code_text(reason_code)}")
+        else:
+            state.update(False, f"reconnect refused: {_reason_code_text(reason_code)}")
+        connack_received.set()
+
+    def on_disconnect(
+        _client: mqtt.Client,
+        _userdata: object,
+        _disconnect_flags: object,
+        reason_code: object,
+        _properties: mqtt.Properties | None = None,
+    ) -> None:
+        state.update(False, f"disconnected from broker ({reason_code}); reconnecting...")
+
+    client.on_connect = on_connect
+    client.on_disconnect = on_disconnect
+    # The network thread reconnects on its own after an unexpected drop.
+    client.reconnect_delay_set(min_delay=RECONNECT_MIN_DELAY_S, max_delay=RECONNECT_MAX_DELAY_S)
+    client.connect(config.host, config.port, config.keepalive)
+    client.loop_start()
+
+    if not connack_received.wait(timeout=CONNECT_TIMEOUT_S):
+        client.loop_stop()
+        client.disconnect()
+        raise TimeoutError("timeout waiting for MQTT connection")
+
+    if connect_error:
+        client.loop_stop()
+        client.disconnect()
+        raise ConnectionError(connect_error[0])
+
+    return client
+
+
+def _loop_once(client: mqtt.Client, deadline: float, waiting_for: str) -> None:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError(f"timeout waiting for {waiting_for}")
+    rc = client.loop(timeout=min(CLI_LOOP_STEP_S, remaining))
+    if rc != mqtt.MQTT_ERR_SUCCESS:
+        raise ConnectionError(f"MQTT connection lost: {mqtt.error_string(rc)}")
+
+
+def _open_unthreaded(config: BrokerConfig) -> mqtt.Client:
+    # Connect and wait for CONNACK on the calling thread. The caller then
+    # drives the network loop itself instead of paho's background thread.
+    connack: object | None = None
+    client = _new_client(config)
+    state = _connection_state(client)
+
+    def on_connect(
+        _client: mqtt.Client,
+        _userdata: object,
+        _flags: dict[str, int],
+        reason_code: object,
+        _properties: mqtt.Properties | None = None,
+    ) -> None:
+        nonlocal connack
+        connack = reason_code
+        if _connect_ok(reason_code):
+            state.update(True, f"connected to {config.host}:{config.port}")
+
+    def on_disconnect(
+        _client: mqtt.Client,
+        _userdata: object,
+        _disconnect_flags: object,
+        reason_code: object,
+        _properties: mqtt.Properties | None = None,
+    ) -> None:
+        state.update(False, f"disconnected from broker ({reason_code})")
+
+    client.on_connect = on_connect
+    client.on_disconnect = on_disconnect
+    client.connect(config.host, config.port, config.keepalive)
+    try:
+        deadline = time.monotonic() + CONNECT_TIMEOUT_S
+        while connack is None:
+            try:
+                _loop_once(client, deadline, "MQTT connection")
+            except ConnectionError:
+                if connack is None:
+                    raise
+        if not _connect_ok(connack):
+            raise ConnectionError(f"MQTT connect failed: {_reason_code_text(connack)}")
+    except BaseException:
+        client.disconnect()
+        raise
+    return client
+
+
+def _publish_once(
+    config: BrokerConfig,
+    build_items: Callable[[], list[tuple[str, int]]],
+) -> list[tuple[str, int]]:
+    # One-shot CLI publish: a couple of packets do not need a network thread.
+    client = _open_unthreaded(config)
+    try:
+        # Build after CONNACK so a start target is not eaten by connect time.
+        items = build_items()
+        infos = [
+            (
+                topic,
+                _publish_value(
+                    client, topic, value, _topic_qos(config, topic), config.retain
+                ),
+            )
+            for topic, value in items
+        ]
+        deadline = time.monotonic() + PUBLISH_TIMEOUT_S
+        while not all(info.is_published() for _topic, info in infos):
+            _loop_once(client, deadline, "publish confirmation")
+        return items
+    finally:
+        client.disconnect()
+
+
+@functools.lru_cache(maxsize=64)
+def _encode_value(value: int) -> bytes:
+    # BPM and stop payloads repeat constantly; epoch-ms starts simply miss.
+    return str(value).encode("ascii")
+
+
+def _publish_value(
+    client: mqtt.Client,
+    topic: str,
+    value: int,
+    qos: int,
+    retain: bool,
+) -> mqtt.MQTTMessageInfo:
+    if not _connection_state(client).connected.wait(timeout=CONNECT_TIMEOUT_S):
+        raise RuntimeError(f"failed to publish {topic}: not connected to broker")
+    info = client.publish(topic, _encode_value(value), qos, retain)
+    if info.rc != mqtt.MQTT_ERR_SUCCESS:
+        raise RuntimeError(f"failed to publish {topic}: rc={info.rc}")
+    return info
+
+
+def _drain_publishes(
+    infos: list[tuple[str, mqtt.MQTTMessageInfo]],
+    timeout: float = PUBLISH_TIMEOUT_S,
+) -> None:
+    # One shared deadline for the whole batch instead of one per message.
+    deadline = time.monotonic() + timeout
+    for topic, info in infos:
+        info.wait_for_publish(timeout=max(0.0, deadline - time.monotonic()))
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            raise RuntimeError(f"failed to publish {topic}: rc={info.rc}")
+
+
+def _topic_qos(config: BrokerConfig, topic: str) -> int:
+    return config.qos_bpm if topic == TOPIC_BPM else config.qos_run
+
+
+def _resolve_run_payload(delay_sec: float) -> int:
+    base_ms = (time.time_ns() // 1_000_000_000) * 1000
+    return base_ms + int(delay_sec * 1000)
@@ -2,17 +2,21 @@
 
 import argparse
 import asyncio
+import collections
 import contextlib
 import os
+import random
+import re
 import signal
+import socket
 import sqlite3
 import threading
 import time
-from concurrent.futures import TimeoutError as FutureTimeoutError
+import concurrent.futures
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from urllib.parse import urlparse
+from typing import Awaitable, Callable, TypeVar
 
 import paho.mqtt.client as mqtt
 
@@ -60,7 +64,51 @@ PHASE_SHIFT_STEP_MS = 5
 SCHEDULER_COARSE_GUARD_S = 0.005
 SCHEDULER_SPIN_GUARD_S = 0.0015
 MAX_PENDING_PLAY_DOT_TASKS = 4
+# Default executor of the shared loop: config writes and MQTT reconnects are
+# the only blocking calls, and never more than a couple run at once.
+LOOP_EXECUTOR_WORKERS = 2
+LOOP_SHUTDOWN_TIMEOUT_S = 5.0
+# While play_dot keeps failing or backing up, log the first occurrence and
+# then every Nth, so a stuck SDK does not put a print on every beat.
+PLAY_DOT_LOG_EVERY = 32
 CLOCK_DRIFT_REANCHOR_THRESHOLD_S = 0.0005
+STATUS_SNAPSHOT_INTERVAL_S = 0.2
+MQTT_MISC_INTERVAL_S = 1.0
+MQTT_RECONNECT_MIN_DELAY_S = 1
+MQTT_RECONNECT_MAX_DELAY_S = 120
+MQTT_STABLE_CONNECTION_S = 300
+# Upper bound on one blocking wait, so Ctrl+C stays responsive on Windows,
+# where a lock wait is not interrupted by signals.
+STOP_WAIT_SLICE_S = 1.0
+# CONNACK reason codes that retrying cannot fix: bad user name or password,
+# not authorized, banned, bad authentication method. MQTT 3.1.1 refusals
+# arrive mapped onto the same MQTT 5 values.
+MQTT_AUTH_REFUSED_CODES = frozenset((134, 135, 138, 140))
+# The subscriber only publishes tiny start ACKs, so paho's outgoing buffers
+# stay small; a backlog past this fails the publish instead of growing.
+MQTT_MAX_QUEUED_MESSAGES = 32
+MQTT_MAX_INFLIGHT_MESSAGES = 10
+
+# Passing the same SQL text every time lets sqlite3's per-connection
+# statement cache reuse the prepared statement.
+CONFIG_CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS app_config (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+)
+"""
+CONFIG_SELECT_SQL = "SELECT value FROM app_config WHERE key = ?"
+CONFIG_UPSERT_SQL = """
+INSERT INTO app_config(key, value, updated_at)
+VALUES(?, ?, ?)
+ON CONFLICT(key) DO UPDATE SET
+    value = excluded.value,
+    updated_at = excluded.updated_at
+"""
+
+
+_T = TypeVar("_T")
 
 
 def _default_config_db_path() -> Path:
@@ -70,11 +118,22 @@ def _default_config_db_path() -> Path:
     return PROJECT_ROOT / "data" / DEFAULT_CONFIG_DB_NAME
 
 
-def _utc_now_iso() -> str:
-    return datetime.now(tz=timezone.utc).replace(microsecond=0).isoformat()
+_UTC_ISO_CACHE: tuple[int, str] = (-1, "")
 
 
-@dataclass(frozen=True)
+def _utc_now_iso() -> str:
+    # The stamp has whole-second resolution, so format each second only once.
+    global _UTC_ISO_CACHE
+    second = int(time.time())
+    cached_second, cached_text = _UTC_ISO_CACHE
+    if second == cached_second:
+        return cached_text
+    text = datetime.fromtimestamp(second, tz=timezone.utc).isoformat()
+    _UTC_ISO_CACHE = (second, text)
+    return text
+
+
+@dataclass(frozen=True, slots=True)
 class BrokerConfig:
     host: str
     port: int
@@ -84,59 +143,72 @@ class BrokerConfig:
     password: str | None
 
 
+@dataclass(frozen=True, slots=True)
+class _InboxCommand:
+    command: Awaitable[object]
+    label: str
+    on_result: Callable[[object], None] | None
+    future: concurrent.futures.Future[object] | None = None
+
+
 class ConfigStore:
     def __init__(self, db_path: Path) -> None:
         self.db_path = db_path
         self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
 
-    def _connect(self) -> sqlite3.Connection:
+    def _connection(self) -> sqlite3.Connection:
+        # Caller holds self._lock. One connection is opened on first use and
+        # shared by the loop thread and executor workers.
+        if self._conn is not None:
+            return self._conn
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        return sqlite3.connect(self.db_path)
-
-    def _initialize(self) -> None:
-        with self._connect() as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS app_config (
-                    key TEXT PRIMARY KEY,
-                    value TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
-                )
-                """
-            )
-            conn.commit()
+        conn = sqlite3.connect(
+            self.db_path,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("PRAGMA cache_size=-20000")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute(CONFIG_CREATE_SQL)
+        except BaseException:
+            conn.close()
+            raise
+        self._conn = conn
+        return conn
 
     def _load_int(self, key: str, default: int) -> int:
         with self._lock:
-            self._initialize()
-            with self._connect() as conn:
-                cursor = conn.execute(
-                    "SELECT value FROM app_config WHERE key = ?",
-                    (key,),
-                )
-                row = cursor.fetchone()
-                if row is None:
-                    return default
-                try:
-                    return int(row[0])
-                except (TypeError, ValueError):
-                    return default
+            cursor = self._connection().execute(CONFIG_SELECT_SQL, (key,))
+            row = cursor.fetchone()
+        if row is None:
+            return default
+        try:
+            return int(row[0])
+        except (TypeError, ValueError):
+            return default
 
     def _save_value(self, key: str, value: int) -> None:
         with self._lock:
-            self._initialize()
-            with self._connect() as conn:
-                conn.execute(
-                    """
-                    INSERT INTO app_config(key, value, updated_at)
-                    VALUES(?, ?, ?)
-                    ON CONFLICT(key) DO UPDATE SET
-                        value = excluded.value,
-                        updated_at = excluded.updated_at
-                    """,
-                    (key, str(value), _utc_now_iso()),
-                )
-                conn.commit()
+            self._connection().execute(
+                CONFIG_UPSERT_SQL,
+                (key, str(value), _utc_now_iso()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            conn = self._conn
+            self._conn = None
+            if conn is None:
+                return
+            try:
+                conn.execute("PRAGMA optimize")
+            finally:
+                conn.close()
 
     def load_phase_shift_ms(self, default: int = 0) -> int:
         return self._load_int("phase_shift_ms", default)
@@ -151,49 +223,68 @@ class ConfigStore:
         self._save_value("vibration_intensity", value)
 
 
+_DOTENV_LOADED = False
+_CREDENTIALS: tuple[str, str, str] | None = None
+# One KEY=value per line with optional surrounding whitespace and matching
+# quotes; a "#" inside an unquoted value is kept, as before. [^\S\n] is
+# whitespace that never runs onto the next line.
+_ENV_LINE_RE = re.compile(
+    r"""^[^\S\n]*([^#=\s][^=\n]*?)[^\S\n]*=[^\S\n]*"""
+    r"""(?:"(.*)"|'(.*)'|(.*?))[^\S\n]*$""",
+    re.MULTILINE,
+)
+
+
 def _load_dotenv(path: str = ENV_FILE) -> None:
+    global _DOTENV_LOADED
+    if _DOTENV_LOADED:
+        return
+    _DOTENV_LOADED = True
+
     user_path = Path(path)
     candidates = [user_path]
     if not user_path.is_absolute():
         candidates.append(PROJECT_ROOT / user_path)
 
-    lines: list[str] | None = None
-    seen_paths: set[Path] = set()
+    env_path: Path | None = None
+    seen_paths: set[str] = set()
     for candidate in candidates:
-        resolved = candidate.resolve()
-        if resolved in seen_paths:
+        # Compare spellings rather than resolve(), which hits the filesystem.
+        key = str(candidate)
+        if key in seen_paths:
             continue
-        seen_paths.add(resolved)
+        seen_paths.add(key)
         if not candidate.is_file():
             continue
-        with open(candidate, encoding="utf-8-sig") as file:
-            lines = file.readlines()
+        env_path = candidate
         break
 
-    if lines is None:
+    if env_path is None:
         return
 
-    for raw_line in lines:
-        line = raw_line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        key = key.strip()
-        value = value.strip()
-        if not key or key in os.environ:
+    text = env_path.read_text(encoding="utf-8-sig")
+    for match in _ENV_LINE_RE.finditer(text):
+        key, double_quoted, single_quoted, bare = match.groups()
+        if key in os.environ:
             continue
-        if len(value) >= 2 and value[0] == value[-1] and value[0] in {"'", '"'}:
-            value = value[1:-1]
+        if double_quoted is not None:
+            value = double_quoted
+        elif single_quoted is not None:
+            value = single_quoted
+        else:
+            value = bare
         os.environ[key] = value
 
 
 def _get_bhaptics_credentials() -> tuple[str, str, str]:
+    global _CREDENTIALS
+    if _CREDENTIALS is not None:
+        return _CREDENTIALS
     _load_dotenv()
-    app_id = os.getenv(ENV_APP_ID, "").strip()
-    api_key = os.getenv(ENV_API_KEY, "").strip()
-    app_name = os.getenv(ENV_APP_NAME, DEFAULT_APP_NAME).strip() or DEFAULT_APP_NAME
+    environ = os.environ
+    app_id = environ.get(ENV_APP_ID, "").strip()
+    api_key = environ.get(ENV_API_KEY, "").strip()
+    app_name = environ.get(ENV_APP_NAME, DEFAULT_APP_NAME).strip() or DEFAULT_APP_NAME
 
     missing: list[str] = []
     if not app_id:
@@ -207,7 +298,10 @@ def _get_bhaptics_credentials() -> tuple[str, str, str]:
             f"set them in environment variables or {ENV_FILE}"
         )
 
-    return app_id, api_key, app_name
+    # Only a complete set is cached, so a retry after fixing the environment
+    # still sees the new values.
+    _CREDENTIALS = (app_id, api_key, app_name)
+    return _CREDENTIALS
 
 
 def _get_default_subscriber_id() -> int:
@@ -227,30 +321,50 @@ def _parse_broker(value: str, fallback_port: int) -> tuple[str, int]:
     if not raw:
         raise ValueError("broker must not be empty")
 
-    if "://" in raw:
-        parsed = urlparse(raw)
-        host = parsed.hostname
-        port = parsed.port or fallback_port
+    # [scheme://][userinfo@]host[:port][/path...], the same pieces urlparse
+    # used to extract, split with plain str methods.
+    rest = raw.partition("://")[2] if "://" in raw else raw
+    for delimiter in "/?#":
+        rest = rest.partition(delimiter)[0]
+    host_port = rest.rpartition("@")[2]
+    if host_port.startswith("["):
+        host, bracket, port_text = host_port[1:].partition("]")
+        if not bracket:
+            raise ValueError(f"invalid broker value: {value!r}")
+        port_text = port_text.partition(":")[2]
     else:
-        parsed = urlparse(f"mqtt://{raw}")
-        host = parsed.hostname
-        port = parsed.port or fallback_port
+        host, _, port_text = host_port.partition(":")
 
     if not host:
         raise ValueError(f"invalid broker value: {value!r}")
 
-    return host, port
+    port = 0
+    if port_text:
+        if not (port_text.isascii() and port_text.isdigit()):
+            raise ValueError(f"invalid broker port: {value!r}")
+        port = int(port_text)
+        if port > 65535:
+            raise ValueError(f"broker port out of range 0-65535: {value!r}")
+
+    return host.lower(), port or fallback_port
+
 
+_STOP_TOKENS = frozenset((b"0", b"false", b"off", b"stop", b"no"))
 
-def _parse_run_payload(payload: str) -> tuple[str, int | None]:
+
+def _parse_run_payload(payload: bytes | str) -> tuple[str, int | None]:
+    # MQTT delivers bytes; int() parses ASCII digits from bytes directly.
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
     normalized = payload.strip().lower()
-    if normalized in {"0", "false", "off", "stop", "no"}:
+    if normalized in _STOP_TOKENS:
         return "stop", None
 
     try:
-        publish_ms = int(payload.strip())
+        publish_ms = int(normalized)
     except ValueError as exc:
-        raise ValueError(f"invalid run payload: {payload!r}") from exc
+        text = payload.decode("utf-8", errors="replace")
+        raise ValueError(f"invalid run payload: {text!r}") from exc
 
     if publish_ms < MIN_EPOCH_MS:
         raise ValueError(
@@ -289,6 +403,77 @@ def _set_process_priority_above_normal() -> None:
         print(f"warning: failed to set process priority: {exc}")
 
 
+_SHARED_LOOP: tuple[asyncio.AbstractEventLoop, threading.Thread] | None = None
+_SHARED_LOOP_LOCK = threading.Lock()
+_SHARED_EXECUTOR: concurrent.futures.ThreadPoolExecutor | None = None
+
+
+def _run_shared_loop(loop: asyncio.AbstractEventLoop) -> None:
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def _shared_event_loop() -> tuple[asyncio.AbstractEventLoop, threading.Thread]:
+    # One loop thread serves every controller in the process; a controller
+    # owns its tasks and timers on it, not the loop itself.
+    global _SHARED_LOOP, _SHARED_EXECUTOR
+    with _SHARED_LOOP_LOCK:
+        if _SHARED_LOOP is None:
+            # AsyncioMqttDriver needs add_reader/add_writer, which Windows'
+            # default ProactorEventLoop does not implement, so always build a
+            # selector loop rather than the platform default.
+            loop = asyncio.SelectorEventLoop()
+            _SHARED_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+                max_workers=LOOP_EXECUTOR_WORKERS,
+                thread_name_prefix="haptics-io",
+            )
+            loop.set_default_executor(_SHARED_EXECUTOR)
+            thread = threading.Thread(
+                target=_run_shared_loop,
+                args=(loop,),
+                name="haptics-loop",
+                daemon=True,
+            )
+            thread.start()
+            _SHARED_LOOP = (loop, thread)
+        return _SHARED_LOOP
+
+
+async def _drain_shared_loop(executor: concurrent.futures.ThreadPoolExecutor | None) -> None:
+    current = asyncio.current_task()
+    tasks = [task for task in asyncio.all_tasks() if task is not current]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.get_running_loop().shutdown_asyncgens()
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _shutdown_shared_loop() -> None:
+    # Called once every controller is closed. Tasks are cancelled and awaited
+    # and the loop closed, so interpreter exit does not report destroyed
+    # pending tasks or coroutines that were never awaited.
+    global _SHARED_LOOP, _SHARED_EXECUTOR
+    with _SHARED_LOOP_LOCK:
+        if _SHARED_LOOP is None:
+            return
+        (loop, thread), executor = _SHARED_LOOP, _SHARED_EXECUTOR
+        _SHARED_LOOP = _SHARED_EXECUTOR = None
+    try:
+        asyncio.run_coroutine_threadsafe(_drain_shared_loop(executor), loop).result(
+            timeout=LOOP_SHUTDOWN_TIMEOUT_S
+        )
+    except Exception as exc:
+        print(f"warning: failed to drain the haptics loop: {exc}")
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=LOOP_SHUTDOWN_TIMEOUT_S)
+    if thread.is_alive():
+        print("warning: haptics loop thread did not stop")
+        return
+    loop.close()
+
+
 class HapticsController:
     def __init__(
         self,
@@ -302,11 +487,11 @@ class HapticsController:
         self.app_name = app_name
         self.config_store = config_store
 
-        self.loop = asyncio.new_event_loop()
-        self.thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.loop, self.thread = _shared_event_loop()
 
         self._status_lock = threading.Lock()
         self.current_bpm = DEFAULT_BPM
+        self._beat_interval = 60.0 / DEFAULT_BPM
         self.current_run = 0
         self.current_run_state = "stopped"
         loaded_intensity = self.config_store.load_vibration_intensity(
@@ -315,6 +500,8 @@ class HapticsController:
         self.vibration_intensity = self._clamp_vibration_intensity(loaded_intensity)
         if loaded_intensity != self.vibration_intensity:
             self.config_store.save_vibration_intensity(self.vibration_intensity)
+        # Rebuilt only when the intensity changes, not once per beat.
+        self._motor_values = (self.vibration_intensity,) * MOTOR_LEN
         self.phase_shift_ms = self.config_store.load_phase_shift_ms(default=0)
         self.pending_phase_shift_ms = 0
         self.session_phase_shift_delta_ms = 0
@@ -322,18 +509,32 @@ class HapticsController:
         self.last_target_ms: int | None = None
         self.last_actual_ms: int | None = None
         self.last_event = f"loaded phase_shift_ms={self.phase_shift_ms}"
+        # Status fields are only written on the loop thread; other threads read
+        # the snapshot, which the loop refreshes on the UI's refresh cadence.
+        self._status_snapshot = self._build_status_snapshot()
 
         self.initialized = False
         self.play_task: asyncio.Task[None] | None = None
         self.scheduled_start_task: asyncio.Task[None] | None = None
         self.play_dot_tasks: set[asyncio.Task[None]] = set()
+        self._play_dot_failures = 0
+        self._dropped_ticks = 0
         self.current_schedule_id = 0
-
-        self.thread.start()
-
-    def _run_loop(self) -> None:
-        asyncio.set_event_loop(self.loop)
-        self.loop.run_forever()
+        self._inbox: collections.deque[_InboxCommand] = collections.deque()
+        self._inbox_scheduled = False
+        self._inbox_ready = asyncio.Event()
+        self._driver_stopping = False
+        self._applying = False
+        self._pending_bpm: int | None = None
+        self._driver_task: asyncio.Task[None] | None = None
+        self._status_handle: asyncio.TimerHandle | None = None
+        self._closed = False
+
+        self.loop.call_soon_threadsafe(self._start_on_loop)
+
+    def _start_on_loop(self) -> None:
+        self._publish_status_snapshot_periodically()
+        self._driver_task = self.loop.create_task(self._drive_commands())
 
     @staticmethod
     def _clamp_vibration_intensity(value: int) -> int:
@@ -344,12 +545,10 @@ class HapticsController:
         return value
 
     def _set_run_state(self, state: str) -> None:
-        with self._status_lock:
-            self.current_run_state = state
+        self.current_run_state = state
 
     def _set_last_event(self, message: str) -> None:
-        with self._status_lock:
-            self.last_event = message
+        self.last_event = message
 
     def _set_schedule_times(
         self,
@@ -357,20 +556,17 @@ class HapticsController:
         target_ms: int,
         actual_ms: int | None,
     ) -> None:
-        with self._status_lock:
-            self.last_payload_target_ms = payload_target_ms
-            self.last_target_ms = target_ms
-            self.last_actual_ms = actual_ms
+        self.last_payload_target_ms = payload_target_ms
+        self.last_target_ms = target_ms
+        self.last_actual_ms = actual_ms
 
     def _get_effective_phase_shift_ms(self) -> int:
-        with self._status_lock:
-            return self.phase_shift_ms + self.session_phase_shift_delta_ms
+        return self.phase_shift_ms + self.session_phase_shift_delta_ms
 
     def _consume_pending_phase_shift_ms(self) -> int:
-        with self._status_lock:
-            shift_ms = self.pending_phase_shift_ms
-            self.pending_phase_shift_ms = 0
-            return shift_ms
+        shift_ms = self.pending_phase_shift_ms
+        self.pending_phase_shift_ms = 0
+        return shift_ms
 
     def _compute_target_ms(self, payload_target_ms: int) -> int:
         effective_shift = self._get_effective_phase_shift_ms()
@@ -384,15 +580,14 @@ class HapticsController:
         return wall_s, perf_s
 
     def _commit_session_phase_shift(self) -> None:
-        with self._status_lock:
-            delta_ms = self.session_phase_shift_delta_ms
-            if delta_ms == 0:
-                self.pending_phase_shift_ms = 0
-                return
-            self.phase_shift_ms += delta_ms
-            self.session_phase_shift_delta_ms = 0
+        delta_ms = self.session_phase_shift_delta_ms
+        if delta_ms == 0:
             self.pending_phase_shift_ms = 0
-            committed_phase = self.phase_shift_ms
+            return
+        self.phase_shift_ms += delta_ms
+        self.session_phase_shift_delta_ms = 0
+        self.pending_phase_shift_ms = 0
+        committed_phase = self.phase_shift_ms
 
         self.config_store.save_phase_shift_ms(committed_phase)
         print(
@@ -464,7 +659,9 @@ class HapticsController:
         else:
             anchor_wall_s = first_wall_s
 
-        beat_interval = 60.0 / self.current_bpm
+        # Fixed for the whole run: every subscriber stays on the grid it started
+        # with, and the publisher refuses BPM changes while a run is active.
+        beat_interval = self._beat_interval
         beat_index = 0
 
         # Keep beat targets on a fixed origin to prevent floating accumulation.
@@ -478,12 +675,19 @@ class HapticsController:
                 self._set_last_event(f"applied pending phase shift shift_ms={shift_ms}")
 
             target_tick = anchor_tick + (beat_index * beat_interval)
+            late_s = time.perf_counter() - target_tick
+            if late_s >= beat_interval:
+                # After a stall, jump to the next beat on the grid in one step
+                # instead of firing the missed ones back-to-back.
+                missed = int(late_s // beat_interval) + 1
+                beat_index += missed
+                target_tick = anchor_tick + (beat_index * beat_interval)
+                print(f"skipped {missed} missed beats beat_index={beat_index}")
+                self._set_last_event(f"skipped {missed} missed beats")
             await self._wait_until_tick(target_tick)
 
-            with self._status_lock:
-                intensity = self.vibration_intensity
             # Timing loop should not block on external I/O.
-            self._schedule_play_dot(intensity)
+            self._schedule_play_dot(self._motor_values)
 
             wall_now_s, perf_now_s = self._sample_wall_and_perf()
             expected_wall_from_perf_s = perf_now_s + (anchor_wall_s - anchor_tick)
@@ -524,8 +728,7 @@ class HapticsController:
                 pass
             return
 
-    async def _play_dot_async(self, intensity: int) -> None:
-        values = [intensity] * MOTOR_LEN
+    async def _play_dot_async(self, values: tuple[int, ...]) -> None:
         await bhaptics_python.play_dot(0, 100, values, -1)
 
     def _on_play_dot_task_done(self, task: asyncio.Task[None]) -> None:
@@ -535,15 +738,22 @@ class HapticsController:
         except asyncio.CancelledError:
             return
         except Exception as exc:
-            print(f"play_dot task failed: {exc}")
+            self._play_dot_failures += 1
+            if self._play_dot_failures % PLAY_DOT_LOG_EVERY == 1:
+                print(f"play_dot task failed: {exc} failures={self._play_dot_failures}")
             self._set_last_event(f"play_dot task failed: {exc}")
+            return
+        self._play_dot_failures = 0
 
-    def _schedule_play_dot(self, intensity: int) -> None:
+    def _schedule_play_dot(self, values: tuple[int, ...]) -> None:
         if len(self.play_dot_tasks) >= MAX_PENDING_PLAY_DOT_TASKS:
-            print("dropping tick: play_dot backlog")
+            self._dropped_ticks += 1
+            if self._dropped_ticks % PLAY_DOT_LOG_EVERY == 1:
+                print(f"dropping tick: play_dot backlog dropped={self._dropped_ticks}")
             self._set_last_event("dropping tick: play_dot backlog")
             return
-        task = self.loop.create_task(self._play_dot_async(intensity))
+        self._dropped_ticks = 0
+        task = self.loop.create_task(self._play_dot_async(values))
         self.play_dot_tasks.add(task)
         task.add_done_callback(self._on_play_dot_task_done)
 
@@ -604,7 +814,7 @@ class HapticsController:
                 print(f"ignored cancelled scheduled start schedule_id={schedule_id}")
                 return
 
-            actual_ms = int(time.time() * 1000)
+            actual_ms = time.time_ns() // 1_000_000
             self._set_schedule_times(payload_target_ms, target_ms, actual_ms)
             print(
                 "scheduled start reached "
@@ -619,23 +829,36 @@ class HapticsController:
         except asyncio.CancelledError:
             raise
 
-    async def _set_bpm_async(self, bpm: int) -> None:
+    def _apply_bpm(self, bpm: int) -> None:
         if bpm <= 0:
             raise ValueError("bpm must be a positive integer")
         self.current_bpm = bpm
+        self._beat_interval = 60.0 / bpm
         self._set_last_event(f"updated bpm={bpm}")
         print(f"updated bpm={bpm}")
 
+    async def _set_bpm_async(self, bpm: int) -> None:
+        self._apply_bpm(bpm)
+
+    async def _apply_pending_bpm(self) -> None:
+        bpm = self._pending_bpm
+        self._pending_bpm = None
+        if bpm is not None:
+            self._apply_bpm(bpm)
+
     async def _set_vibration_intensity_async(self, intensity: int) -> None:
         if intensity < VIBRATION_INTENSITY_MIN or intensity > VIBRATION_INTENSITY_MAX:
             raise ValueError(
                 "vibration intensity must be in "
                 f"[{VIBRATION_INTENSITY_MIN}, {VIBRATION_INTENSITY_MAX}]"
             )
-        with self._status_lock:
-            self.vibration_intensity = intensity
-        await asyncio.to_thread(self.config_store.save_vibration_intensity, intensity)
+        self.vibration_intensity = intensity
+        self._motor_values = (intensity,) * MOTOR_LEN
+        await self.loop.run_in_executor(
+            None, self.config_store.save_vibration_intensity, intensity
+        )
         self._set_last_event(f"updated vibration_intensity={intensity}")
+        self._publish_status_snapshot()
         print(f"updated vibration_intensity={intensity}")
 
     async def _set_phase_shift_async(self, phase_shift_ms: int) -> None:
@@ -651,14 +874,13 @@ class HapticsController:
         )
 
         if running:
-            with self._status_lock:
-                effective = self.phase_shift_ms + self.session_phase_shift_delta_ms
-                delta_ms = phase_shift_ms - effective
-                if delta_ms == 0:
-                    return
-                self.pending_phase_shift_ms += delta_ms
-                self.session_phase_shift_delta_ms += delta_ms
-                queued_ms = self.pending_phase_shift_ms
+            effective = self.phase_shift_ms + self.session_phase_shift_delta_ms
+            delta_ms = phase_shift_ms - effective
+            if delta_ms == 0:
+                return
+            self.pending_phase_shift_ms += delta_ms
+            self.session_phase_shift_delta_ms += delta_ms
+            queued_ms = self.pending_phase_shift_ms
             print(
                 "queued phase shift update during running "
                 f"requested_ms={phase_shift_ms} delta_ms={delta_ms} "
@@ -668,19 +890,22 @@ class HapticsController:
                 "queued phase shift update "
                 f"requested_ms={phase_shift_ms} delta_ms={delta_ms}"
             )
+            self._publish_status_snapshot()
             return
 
-        with self._status_lock:
-            self.phase_shift_ms = phase_shift_ms
-            self.pending_phase_shift_ms = 0
-            self.session_phase_shift_delta_ms = 0
-            last_payload_target_ms = (
-                self.last_payload_target_ms if scheduled else None
-            )
+        self.phase_shift_ms = phase_shift_ms
+        self.pending_phase_shift_ms = 0
+        self.session_phase_shift_delta_ms = 0
+        last_payload_target_ms = (
+            self.last_payload_target_ms if scheduled else None
+        )
 
-        await asyncio.to_thread(self.config_store.save_phase_shift_ms, phase_shift_ms)
+        await self.loop.run_in_executor(
+            None, self.config_store.save_phase_shift_ms, phase_shift_ms
+        )
         print(f"updated phase_shift_ms={phase_shift_ms}")
         self._set_last_event(f"updated phase_shift_ms={phase_shift_ms}")
+        self._publish_status_snapshot()
 
         if last_payload_target_ms is not None:
             await self._schedule_start_async(last_payload_target_ms)
@@ -688,8 +913,7 @@ class HapticsController:
     async def _shift_phase_async(self, delta_ms: int) -> None:
         if delta_ms == 0:
             return
-        with self._status_lock:
-            effective = self.phase_shift_ms + self.session_phase_shift_delta_ms
+        effective = self.phase_shift_ms + self.session_phase_shift_delta_ms
         requested = effective + delta_ms
         if requested < PHASE_SHIFT_MIN_MS:
             requested = PHASE_SHIFT_MIN_MS
@@ -714,8 +938,9 @@ class HapticsController:
             return False
 
         target_ms = self._compute_target_ms(payload_target_ms)
-        now_wall_s, _ = self._sample_wall_and_perf()
-        lag_ms = int((now_wall_s - (target_ms / 1000.0)) * 1000)
+        # Integer ms from one clock read; the wait itself runs on perf_counter.
+        now_ms = time.time_ns() // 1_000_000
+        lag_ms = now_ms - target_ms
         if lag_ms > 0:
             print(
                 "rejected late start timestamp "
@@ -739,7 +964,7 @@ class HapticsController:
             self._run_scheduled_start(payload_target_ms, target_ms, schedule_id)
         )
 
-        delay_ms = max(0, int((target_ms / 1000.0 - now_wall_s) * 1000))
+        delay_ms = max(0, target_ms - now_ms)
         effective_shift = self._get_effective_phase_shift_ms()
         print(
             "scheduled start "
@@ -761,78 +986,340 @@ class HapticsController:
             await bhaptics_python.stop_all()
 
         self._commit_session_phase_shift()
+        await self.loop.run_in_executor(None, self.config_store.close)
 
         if self.initialized:
             await bhaptics_python.close()
             self.initialized = False
+        self._driver_stopping = True
+        if self._status_handle is not None:
+            self._status_handle.cancel()
+            self._status_handle = None
+        self._discard_inbox()
+        self._publish_status_snapshot()
+
+    def _discard_inbox(self) -> None:
+        # Commands queued behind close never run; close their coroutines so
+        # they are not reported as never awaited, and fail their callers.
+        while self._inbox:
+            self._reject(self._inbox.popleft())
+
+    @staticmethod
+    def _reject(item: _InboxCommand) -> None:
+        close = getattr(item.command, "close", None)
+        if close is not None:
+            close()
+        if item.future is not None and not item.future.done():
+            item.future.set_exception(RuntimeError("haptics controller is closed"))
+
+    async def _drive_commands(self) -> None:
+        # The single consumer of the inbox: commands apply one at a time in
+        # arrival order, whether they came from MQTT without waiting or from a
+        # blocking UI call.
+        while not self._driver_stopping:
+            await self._inbox_ready.wait()
+            self._inbox_ready.clear()
+            while self._inbox and not self._driver_stopping:
+                await self._apply(self._inbox.popleft())
+
+    async def _apply(self, item: _InboxCommand) -> None:
+        self._applying = True
+        try:
+            result = await item.command
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            if item.future is not None:
+                item.future.set_exception(exc)
+            else:
+                print(f"failed applying {item.label}: {exc}")
+            return
+        finally:
+            self._applying = False
+        if item.future is not None:
+            item.future.set_result(result)
+        elif item.on_result is not None:
+            item.on_result(result)
+
+    def _post(
+        self,
+        command: Awaitable[_T],
+        label: str,
+        on_result: Callable[[_T], None] | None = None,
+        future: concurrent.futures.Future[_T] | None = None,
+    ) -> None:
+        # Fire-and-forget unless a caller asked for a future, and from another
+        # thread at most one loop wakeup per burst of messages.
+        if self._driver_stopping:
+            self._reject(_InboxCommand(command, label, on_result, future))
+            return
+        self._inbox.append(_InboxCommand(command, label, on_result, future))
+        if threading.get_ident() == self.thread.ident:
+            self._inbox_ready.set()
+            return
+        if not self._inbox_scheduled:
+            self._inbox_scheduled = True
+            self.loop.call_soon_threadsafe(self._wake_driver)
+
+    def _wake_driver(self) -> None:
+        # Clear the flag before the driver drains so a message appended
+        # meanwhile either gets popped or schedules a fresh wakeup.
+        self._inbox_scheduled = False
+        self._inbox_ready.set()
+
+    def _call(self, command: Awaitable[_T], label: str, timeout: float) -> _T:
+        # Blocking variant for UI callers that need the result or the error.
+        future: concurrent.futures.Future[_T] = concurrent.futures.Future()
+        self._post(command, label, future=future)
+        return future.result(timeout=timeout)
+
+    def set_bpm_nowait(self, bpm: int) -> None:
+        # A BPM change is plain state. On the loop thread with nothing queued
+        # or in flight it is stored directly. Otherwise it waits behind
+        # earlier commands in a single latest-wins slot, so a burst of BPM
+        # messages costs one queued command and the last BPM received wins.
+        if threading.get_ident() != self.thread.ident:
+            self._post(self._set_bpm_async(bpm), f"bpm={bpm}")
+            return
+        if not self._inbox and not self._applying:
+            try:
+                self._apply_bpm(bpm)
+            except ValueError as exc:
+                print(f"failed applying bpm={bpm}: {exc}")
+            return
+        queued = self._pending_bpm is not None
+        self._pending_bpm = bpm
+        if not queued:
+            self._post(self._apply_pending_bpm(), "pending bpm")
+
+    def stop_nowait(self) -> None:
+        self._post(self._stop_async(), "run=0")
+
+    def schedule_start_nowait(
+        self,
+        payload_target_ms: int,
+        on_result: Callable[[bool], None] | None = None,
+    ) -> None:
+        self._post(
+            self._schedule_start_async(payload_target_ms),
+            f"run={payload_target_ms}",
+            on_result,
+        )
 
     def set_bpm(self, bpm: int, timeout: float = 5.0) -> None:
-        future = asyncio.run_coroutine_threadsafe(self._set_bpm_async(bpm), self.loop)
-        future.result(timeout=timeout)
+        self._call(self._set_bpm_async(bpm), f"bpm={bpm}", timeout)
 
     def set_vibration_intensity(self, intensity: int, timeout: float = 5.0) -> None:
-        future = asyncio.run_coroutine_threadsafe(
+        self._call(
             self._set_vibration_intensity_async(intensity),
-            self.loop,
+            f"vibration_intensity={intensity}",
+            timeout,
         )
-        future.result(timeout=timeout)
 
     def set_phase_shift(self, phase_shift_ms: int, timeout: float = 5.0) -> None:
-        future = asyncio.run_coroutine_threadsafe(
+        self._call(
             self._set_phase_shift_async(phase_shift_ms),
-            self.loop,
+            f"phase_shift_ms={phase_shift_ms}",
+            timeout,
         )
-        future.result(timeout=timeout)
 
     def shift_phase(self, delta_ms: int, timeout: float = 5.0) -> None:
-        future = asyncio.run_coroutine_threadsafe(
-            self._shift_phase_async(delta_ms),
-            self.loop,
-        )
-        future.result(timeout=timeout)
+        self._call(self._shift_phase_async(delta_ms), f"shift_phase={delta_ms}", timeout)
 
     def stop(self, timeout: float = 5.0) -> None:
-        future = asyncio.run_coroutine_threadsafe(self._stop_async(), self.loop)
-        future.result(timeout=timeout)
+        self._call(self._stop_async(), "run=0", timeout)
 
     def initialize(self, timeout: float = 5.0) -> None:
-        future = asyncio.run_coroutine_threadsafe(self._initialize(), self.loop)
-        future.result(timeout=timeout)
+        self._call(self._initialize(), "initialize", timeout)
 
     def schedule_start(self, payload_target_ms: int, timeout: float = 5.0) -> bool:
-        future = asyncio.run_coroutine_threadsafe(
+        return self._call(
             self._schedule_start_async(payload_target_ms),
-            self.loop,
+            f"run={payload_target_ms}",
+            timeout,
+        )
+
+    def _build_status_snapshot(self) -> dict[str, int | str | None]:
+        effective_phase_shift = self.phase_shift_ms + self.session_phase_shift_delta_ms
+        return {
+            "current_bpm": self.current_bpm,
+            "run_state": self.current_run_state,
+            "vibration_intensity": self.vibration_intensity,
+            "phase_shift_ms": self.phase_shift_ms,
+            "pending_phase_shift_ms": self.pending_phase_shift_ms,
+            "effective_phase_shift_ms": effective_phase_shift,
+            "last_payload_target_ms": self.last_payload_target_ms,
+            "last_target_ms": self.last_target_ms,
+            "last_actual_ms": self.last_actual_ms,
+            "last_event": self.last_event,
+        }
+
+    def _publish_status_snapshot(self) -> None:
+        snapshot = self._build_status_snapshot()
+        with self._status_lock:
+            self._status_snapshot = snapshot
+
+    def _publish_status_snapshot_periodically(self) -> None:
+        self._publish_status_snapshot()
+        self._status_handle = self.loop.call_later(
+            STATUS_SNAPSHOT_INTERVAL_S,
+            self._publish_status_snapshot_periodically,
         )
-        return future.result(timeout=timeout)
 
     def get_status_snapshot(self) -> dict[str, int | str | None]:
         with self._status_lock:
-            effective_phase_shift = self.phase_shift_ms + self.session_phase_shift_delta_ms
-            return {
-                "current_bpm": self.current_bpm,
-                "run_state": self.current_run_state,
-                "vibration_intensity": self.vibration_intensity,
-                "phase_shift_ms": self.phase_shift_ms,
-                "pending_phase_shift_ms": self.pending_phase_shift_ms,
-                "effective_phase_shift_ms": effective_phase_shift,
-                "last_payload_target_ms": self.last_payload_target_ms,
-                "last_target_ms": self.last_target_ms,
-                "last_actual_ms": self.last_actual_ms,
-                "last_event": self.last_event,
-            }
+            return self._status_snapshot
 
     def close(self) -> None:
-        if not self.loop.is_running():
+        # Leaves the shared loop running for any other controller.
+        if self._closed:
             return
+        self._closed = True
         try:
-            future = asyncio.run_coroutine_threadsafe(self._close_async(), self.loop)
-            future.result(timeout=5.0)
+            self._call(self._close_async(), "close", 5.0)
         except Exception as exc:
             print(f"warning: failed to cleanly close haptics controller: {exc}")
-        finally:
-            self.loop.call_soon_threadsafe(self.loop.stop)
-            self.thread.join(timeout=2.0)
+
+
+def _wait_for_stop(stop_event: threading.Event, timeout_s: float) -> bool:
+    deadline = time.monotonic() + timeout_s
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return stop_event.is_set()
+        if stop_event.wait(min(remaining, STOP_WAIT_SLICE_S)):
+            return True
+
+
+def _connack_refused_auth(reason_code: object) -> bool:
+    return getattr(reason_code, "value", reason_code) in MQTT_AUTH_REFUSED_CODES
+
+
+def _decorrelated_backoff(previous_s: float) -> float:
+    # Decorrelated jitter: each delay is drawn from [min, 3 * previous] and
+    # capped, so subscribers that lost the same broker spread their retries.
+    return min(
+        MQTT_RECONNECT_MAX_DELAY_S,
+        random.uniform(MQTT_RECONNECT_MIN_DELAY_S, previous_s * 3),
+    )
+
+
+class AsyncioMqttDriver:
+    # Runs a paho client on an asyncio loop through paho's external-loop
+    # socket callbacks, replacing loop_start()'s network thread. Packets are
+    # read, written and kept alive on the controller loop, so MQTT callbacks
+    # run there as well.
+    def __init__(self, client: mqtt.Client, loop: asyncio.AbstractEventLoop) -> None:
+        self.client = client
+        self.loop = loop
+        self._stopping = False
+        self._misc_handle: asyncio.TimerHandle | None = None
+        self._reconnecting = False
+        self._reconnect_at = 0.0
+        self._reconnect_delay: float = MQTT_RECONNECT_MIN_DELAY_S
+        self._connected_at: float | None = None
+
+        client.on_socket_open = self._on_socket_open
+        client.on_socket_close = self._on_socket_close
+        client.on_socket_register_write = self._on_socket_register_write
+        client.on_socket_unregister_write = self._on_socket_unregister_write
+
+    def _on_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _call_on_loop(self, callback: Callable[..., None], *args: object) -> None:
+        # connect()/reconnect() run off the loop thread and fire the socket
+        # callbacks there; selector changes must happen on the loop.
+        if self._on_loop_thread():
+            callback(*args)
+        else:
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def _on_socket_open(self, _client: mqtt.Client, _userdata: object, sock: object) -> None:
+        self._call_on_loop(self._add_socket, sock)
+
+    def _on_socket_close(self, _client: mqtt.Client, _userdata: object, sock: object) -> None:
+        self._call_on_loop(self._remove_socket, sock)
+
+    def _on_socket_register_write(
+        self,
+        _client: mqtt.Client,
+        _userdata: object,
+        sock: object,
+    ) -> None:
+        self._call_on_loop(self._add_writer, sock)
+
+    def _on_socket_unregister_write(
+        self,
+        _client: mqtt.Client,
+        _userdata: object,
+        sock: object,
+    ) -> None:
+        self._call_on_loop(self._remove_writer, sock)
+
+    def _add_socket(self, sock: object) -> None:
+        self._connected_at = time.monotonic()
+        self.loop.add_reader(sock, self.client.loop_read)
+        if self._misc_handle is None:
+            self._misc_handle = self.loop.call_soon(self._misc)
+
+    def _remove_socket(self, sock: object) -> None:
+        self.loop.remove_reader(sock)
+        self.loop.remove_writer(sock)
+        self._connected_at = None
+        if not self._stopping:
+            self._schedule_reconnect()
+
+    def _schedule_reconnect(self) -> None:
+        # The delay keeps growing across flapping connections and only
+        # resets once a connection has stayed up for a while.
+        self._reconnect_delay = _decorrelated_backoff(self._reconnect_delay)
+        self._reconnect_at = time.monotonic() + self._reconnect_delay
+
+    def _add_writer(self, sock: object) -> None:
+        if sock is self.client.socket():
+            self.loop.add_writer(sock, self.client.loop_write)
+
+    def _remove_writer(self, sock: object) -> None:
+        self.loop.remove_writer(sock)
+
+    def _misc(self) -> None:
+        self._misc_handle = None
+        if self._stopping:
+            return
+        if self.client.socket() is not None:
+            self.client.loop_misc()
+            connected_at = self._connected_at
+            if (
+                connected_at is not None
+                and time.monotonic() - connected_at >= MQTT_STABLE_CONNECTION_S
+            ):
+                self._reconnect_delay = MQTT_RECONNECT_MIN_DELAY_S
+        elif not self._reconnecting and time.monotonic() >= self._reconnect_at:
+            self._reconnecting = True
+            future = self.loop.run_in_executor(None, self.client.reconnect)
+            future.add_done_callback(self._on_reconnect_done)
+        self._misc_handle = self.loop.call_later(MQTT_MISC_INTERVAL_S, self._misc)
+
+    def _on_reconnect_done(self, future: asyncio.Future[object]) -> None:
+        self._reconnecting = False
+        try:
+            future.result()
+        except Exception as exc:
+            self._schedule_reconnect()
+            print(f"reconnect failed: {exc}; retrying in {self._reconnect_delay:.1f}s")
+
+    def disconnect(self) -> None:
+        # Must run on the loop thread, like every other client call here.
+        self._stopping = True
+        if self._misc_handle is not None:
+            self._misc_handle.cancel()
+            self._misc_handle = None
+        self.client.disconnect()
+
 
 class SubscriberControlUI:
     REFRESH_MS = 200
@@ -842,25 +1329,19 @@ class SubscriberControlUI:
         root: tk.Tk,
         controller: HapticsController,
         request_stop,
+        stop_event: threading.Event,
     ) -> None:
         self.root = root
         self.controller = controller
         self.request_stop = request_stop
+        self.stop_event = stop_event
 
-        self.bpm_var = tk.StringVar(value="-")
-        self.run_state_var = tk.StringVar(value="-")
-        self.vibration_intensity_var = tk.StringVar(value="-")
         self.vibration_intensity_entry_var = tk.StringVar(
             value=str(DEFAULT_VIBRATION_INTENSITY)
         )
-        self.applied_phase_shift_var = tk.StringVar(value="-")
-        self.pending_phase_shift_var = tk.StringVar(value="-")
-        self.target_var = tk.StringVar(value="-")
-        self.actual_var = tk.StringVar(value="-")
-        self.offset_var = tk.StringVar(value="-")
-        self.last_event_var = tk.StringVar(value="-")
         self.apply_status_var = tk.StringVar(value="")
         self.vibration_intensity_entry_dirty = False
+        self._last_snapshot: dict[str, int | str | None] | None = None
 
         self._build_layout()
         self._refresh()
@@ -873,15 +1354,9 @@ class SubscriberControlUI:
         frame = tk.Frame(self.root, padx=12, pady=12)
         frame.pack(fill=tk.BOTH, expand=True)
 
-        tk.Label(frame, text="Current BPM").grid(row=0, column=0, sticky="w")
-        tk.Label(frame, textvariable=self.bpm_var).grid(row=0, column=1, sticky="w")
-
-        tk.Label(frame, text="Run State").grid(row=1, column=0, sticky="w")
-        tk.Label(frame, textvariable=self.run_state_var).grid(row=1, column=1, sticky="w")
-
-        tk.Label(frame, text="Vibration Intensity").grid(row=2, column=0, sticky="w")
+        tk.Label(frame, text="Vibration Intensity").grid(row=0, column=0, sticky="w")
         intensity_controls = tk.Frame(frame)
-        intensity_controls.grid(row=2, column=1, sticky="w")
+        intensity_controls.grid(row=0, column=1, sticky="w")
 
         tk.Button(
             intensity_controls,
@@ -915,14 +1390,9 @@ class SubscriberControlUI:
             command=self._apply_vibration_intensity,
         ).pack(side=tk.LEFT, padx=(8, 0))
 
-        tk.Label(frame, text="Applied Intensity").grid(row=3, column=0, sticky="w")
-        tk.Label(frame, textvariable=self.vibration_intensity_var).grid(
-            row=3, column=1, sticky="w"
-        )
-
-        tk.Label(frame, text="Phase Shift (ms)").grid(row=4, column=0, sticky="w")
+        tk.Label(frame, text="Phase Shift (ms)").grid(row=1, column=0, sticky="w")
         phase_controls = tk.Frame(frame)
-        phase_controls.grid(row=4, column=1, sticky="w")
+        phase_controls.grid(row=1, column=1, sticky="w")
         tk.Button(
             phase_controls,
             text="Slower",
@@ -940,32 +1410,13 @@ class SubscriberControlUI:
             text=f"step {PHASE_SHIFT_STEP_MS}ms",
         ).pack(side=tk.LEFT, padx=(12, 0))
 
-        tk.Label(frame, text="Applied Phase Shift").grid(row=5, column=0, sticky="w")
-        tk.Label(frame, textvariable=self.applied_phase_shift_var).grid(
-            row=5, column=1, sticky="w"
-        )
-
-        tk.Label(frame, text="Pending Phase Shift").grid(row=6, column=0, sticky="w")
-        tk.Label(frame, textvariable=self.pending_phase_shift_var).grid(
-            row=6, column=1, sticky="w"
-        )
-
-        tk.Label(frame, text="Last target_ms").grid(row=7, column=0, sticky="w")
-        tk.Label(frame, textvariable=self.target_var).grid(row=7, column=1, sticky="w")
-
-        tk.Label(frame, text="Last actual_ms").grid(row=8, column=0, sticky="w")
-        tk.Label(frame, textvariable=self.actual_var).grid(row=8, column=1, sticky="w")
-
-        tk.Label(frame, text="actual-target (ms)").grid(row=9, column=0, sticky="w")
-        tk.Label(frame, textvariable=self.offset_var).grid(row=9, column=1, sticky="w")
-
-        tk.Label(frame, text="Last Event").grid(row=10, column=0, sticky="w")
-        tk.Label(frame, textvariable=self.last_event_var, anchor="w").grid(
-            row=10, column=1, sticky="w"
-        )
+        # All read-only status rows live in one label so a refresh is a single
+        # Tcl call rather than one per field.
+        self._status_label = tk.Label(frame, text="", justify="left", anchor="nw")
+        self._status_label.grid(row=2, column=0, columnspan=2, sticky="nw", pady=(8, 0))
 
         tk.Label(frame, textvariable=self.apply_status_var, fg="#1a5f7a").grid(
-            row=11, column=0, columnspan=2, sticky="w", pady=(8, 0)
+            row=3, column=0, columnspan=2, sticky="w", pady=(8, 0)
         )
 
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
@@ -1032,23 +1483,37 @@ class SubscriberControlUI:
                 messagebox.showerror("Apply failed", str(exc))
 
     def _refresh(self) -> None:
+        if self.stop_event.is_set():
+            # Set from the loop thread, which must not touch Tk; finish the
+            # stop here on the Tk thread.
+            self._on_close()
+            return
         snapshot = self.controller.get_status_snapshot()
-
-        self.bpm_var.set(str(snapshot["current_bpm"]))
-        self.run_state_var.set(str(snapshot["run_state"]))
-        self.vibration_intensity_var.set(str(snapshot["vibration_intensity"]))
-        self.applied_phase_shift_var.set(str(snapshot["effective_phase_shift_ms"]))
-        self.pending_phase_shift_var.set(str(snapshot["pending_phase_shift_ms"]))
-        self.last_event_var.set(str(snapshot["last_event"]))
+        if snapshot == self._last_snapshot:
+            # Nothing changed; skip the label rewrite and its redraw.
+            self.root.after(self.REFRESH_MS, self._refresh)
+            return
+        self._last_snapshot = snapshot
 
         target_ms = snapshot["last_target_ms"]
         actual_ms = snapshot["last_actual_ms"]
-        self.target_var.set("-" if target_ms is None else str(target_ms))
-        self.actual_var.set("-" if actual_ms is None else str(actual_ms))
         if target_ms is None or actual_ms is None:
-            self.offset_var.set("-")
+            offset = "-"
         else:
-            self.offset_var.set(str(actual_ms - target_ms))
+            offset = str(actual_ms - target_ms)
+        self._status_label.config(
+            text=(
+                f"Current BPM: {snapshot['current_bpm']}\n"
+                f"Run State: {snapshot['run_state']}\n"
+                f"Applied Intensity: {snapshot['vibration_intensity']}\n"
+                f"Applied Phase Shift: {snapshot['effective_phase_shift_ms']}\n"
+                f"Pending Phase Shift: {snapshot['pending_phase_shift_ms']}\n"
+                f"Last target_ms: {'-' if target_ms is None else target_ms}\n"
+                f"Last actual_ms: {'-' if actual_ms is None else actual_ms}\n"
+                f"actual-target (ms): {offset}\n"
+                f"Last Event: {snapshot['last_event']}"
+            )
+        )
 
         if not self.vibration_intensity_entry_dirty:
             self.vibration_intensity_entry_var.set(str(snapshot["vibration_intensity"]))
@@ -1146,23 +1611,36 @@ def main() -> int:
     except Exception as exc:
         print(f"error: failed to initialize bHaptics before start: {exc}")
         controller.close()
+        _shutdown_shared_loop()
         return 1
     stop_event = threading.Event()
+    stop_callbacks: list[Callable[[], None]] = []
     connect_event = threading.Event()
     connect_error: list[str] = []
+    auth_refused = threading.Event()
+    stop_requested = threading.Event()
 
     client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    client.max_queued_messages_set(MQTT_MAX_QUEUED_MESSAGES)
+    client.max_inflight_messages_set(MQTT_MAX_INFLIGHT_MESSAGES)
     if config.username:
         client.username_pw_set(config.username, config.password)
 
+    mqtt_driver = AsyncioMqttDriver(client, controller.loop)
+
     def _request_stop() -> None:
-        if stop_event.is_set():
+        if stop_requested.is_set():
             return
+        stop_requested.set()
         stop_event.set()
-        try:
-            client.disconnect()
-        except Exception:
-            pass
+        with contextlib.suppress(RuntimeError):
+            controller.loop.call_soon_threadsafe(mqtt_driver.disconnect)
+        for callback in stop_callbacks:
+            callback()
+
+    # Built once per session; paho reads the list without modifying it, and
+    # needs a list (a bare tuple would be taken as one (topic, qos) pair).
+    subscriptions = [(TOPIC_BPM, config.qos), (TOPIC_RUN, config.qos)]
 
     def on_connect(
         _client: mqtt.Client,
@@ -1191,55 +1669,73 @@ def main() -> int:
             return str(code).strip().lower() in {"success", "0"}
 
         if _connect_ok(reason_code):
-            _client.subscribe([(TOPIC_BPM, config.qos), (TOPIC_RUN, config.qos)])
+            _client.subscribe(subscriptions)
             print(f"subscribed to {TOPIC_BPM}, {TOPIC_RUN}")
             connect_event.set()
             return
 
-        connect_error.append(f"MQTT connect failed: {reason_code}")
+        connect_error[:] = [f"MQTT connect failed: {reason_code}"]
         connect_event.set()
+        if _connack_refused_auth(reason_code):
+            # The broker will keep refusing these credentials; stop instead
+            # of reconnecting with them forever. This runs on the loop
+            # thread, so only flag the stop; the main or Tk thread acts on it.
+            auth_refused.set()
+            stop_event.set()
+
+    def _handle_bpm(payload: bytes) -> None:
+        # bytes.isdigit() is ASCII-only, so junk is rejected without raising.
+        data = payload.strip()
+        if not data.isdigit():
+            text = payload.decode("utf-8", errors="ignore").strip()
+            print(f"ignored invalid payload for {TOPIC_BPM}: {text!r} (expected digits)")
+            return
+        controller.set_bpm_nowait(int(data))
+
+    def _handle_run(payload: bytes) -> None:
+        action, payload_target_ms = _parse_run_payload(payload)
+        if action == "stop":
+            controller.stop_nowait()
+            return
+        if payload_target_ms is None:
+            raise ValueError("missing start timestamp")
+        controller.schedule_start_nowait(payload_target_ms, _publish_start_ack)
+
+    message_handlers: dict[str, Callable[[bytes], None]] = {
+        TOPIC_BPM: _handle_bpm,
+        TOPIC_RUN: _handle_run,
+    }
 
     def on_message(
         _client: mqtt.Client,
         _userdata: object,
         msg: mqtt.MQTTMessage,
     ) -> None:
-        payload = msg.payload.decode("utf-8", errors="ignore").strip()
-        try:
-            if msg.topic == TOPIC_BPM:
-                bpm = int(payload)
-                controller.set_bpm(bpm)
-                return
-
-            if msg.topic == TOPIC_RUN:
-                action, payload_target_ms = _parse_run_payload(payload)
-                if action == "stop":
-                    controller.stop()
-                else:
-                    if payload_target_ms is None:
-                        raise ValueError("missing start timestamp")
-                    accepted = controller.schedule_start(payload_target_ms)
-                    ack_payload = (
-                        ACK_START_ACCEPTED if accepted else ACK_START_REJECTED_LATE
-                    )
-                    info = _client.publish(
-                        ack_topic,
-                        payload=ack_payload,
-                        qos=config.qos,
-                        retain=False,
-                    )
-                    if info.rc != mqtt.MQTT_ERR_SUCCESS:
-                        print(f"failed to publish {ack_topic}={ack_payload}: rc={info.rc}")
-                return
-
+        handler = message_handlers.get(msg.topic)
+        if handler is None:
             print(f"ignored unknown topic: {msg.topic}")
+            return
+        try:
+            # Runs on the controller loop; commands are queued there and
+            # report their own failures.
+            handler(msg.payload)
         except ValueError as exc:
+            payload = msg.payload.decode("utf-8", errors="ignore").strip()
             print(f"ignored invalid payload for {msg.topic}: {payload!r} ({exc})")
-        except FutureTimeoutError:
-            print(f"timeout applying message for {msg.topic}")
         except Exception as exc:
             print(f"failed handling message for {msg.topic}: {exc}")
 
+    def _publish_start_ack(accepted: bool) -> None:
+        ack_payload = ACK_START_ACCEPTED if accepted else ACK_START_REJECTED_LATE
+        info = client.publish(
+            ack_topic,
+            payload=ack_payload,
+            qos=config.qos,
+            retain=False,
+        )
+        if info.rc != mqtt.MQTT_ERR_SUCCESS:
+            print(f"failed to publish {ack_topic}={ack_payload}: rc={info.rc}")
+
     def on_disconnect(
         _client: mqtt.Client,
         _userdata: object,
@@ -1251,6 +1747,14 @@ def main() -> int:
             return
         print(f"disconnected from broker: {reason_code}")
 
+    def _session_exit_code() -> int:
+        # A transient refusal during a reconnect recovers on its own; only
+        # refused credentials end the session as a failure.
+        if auth_refused.is_set():
+            print(f"error: {connect_error[0]}")
+            return 1
+        return 0
+
     client.on_connect = on_connect
     client.on_message = on_message
     client.on_disconnect = on_disconnect
@@ -1264,8 +1768,20 @@ def main() -> int:
 
     try:
         print(f"connecting to MQTT broker {config.host}:{config.port}")
-        client.connect(config.host, config.port, config.keepalive)
-        client.loop_start()
+        connect_delay: float = MQTT_RECONNECT_MIN_DELAY_S
+        while True:
+            try:
+                client.connect(config.host, config.port, config.keepalive)
+                break
+            except socket.gaierror as exc:
+                # A host name that does not resolve will not start resolving.
+                print(f"error: cannot resolve MQTT broker {config.host!r}: {exc}")
+                return 1
+            except OSError as exc:
+                connect_delay = _decorrelated_backoff(connect_delay)
+                print(f"MQTT connect failed: {exc}; retrying in {connect_delay:.1f}s")
+                if _wait_for_stop(stop_event, connect_delay):
+                    return 0
 
         if not connect_event.wait(timeout=5):
             print("error: timeout waiting for MQTT connection")
@@ -1279,27 +1795,37 @@ def main() -> int:
         if args.headless or tk is None:
             if not args.headless and tk is None:
                 print("warning: tkinter not available, running in headless mode")
-            while not stop_event.is_set():
-                time.sleep(0.2)
-            return 0
+            while not stop_event.wait(STOP_WAIT_SLICE_S):
+                pass
+            return _session_exit_code()
 
         root = tk.Tk()
-        SubscriberControlUI(root=root, controller=controller, request_stop=_request_stop)
+        SubscriberControlUI(
+            root=root,
+            controller=controller,
+            request_stop=_request_stop,
+            stop_event=stop_event,
+        )
 
-        def _poll_stop() -> None:
-            if stop_event.is_set():
+        def _destroy_root() -> None:
+            with contextlib.suppress(tk.TclError):
                 if root.winfo_exists():
                     root.destroy()
-                return
-            root.after(200, _poll_stop)
 
-        root.after(200, _poll_stop)
+        def _close_root_on_stop() -> None:
+            # Stop requests arrive on the Tk thread: the signal handler, the
+            # window's close button, or the UI's refresh timer noticing a
+            # stop flagged from the loop thread.
+            with contextlib.suppress(tk.TclError):
+                root.after_idle(_destroy_root)
+
+        stop_callbacks.append(_close_root_on_stop)
         root.mainloop()
-        return 0
+        return _session_exit_code()
     finally:
-        client.loop_stop()
-        client.disconnect()
+        _request_stop()
         controller.close()
+        _shutdown_shared_loop()
 
 
 if __name__ == "__main__":
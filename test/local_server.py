@@ -2,7 +2,6 @@ import atexit
 import asyncio
 import concurrent.futures
 import threading
-import time
 
 import bhaptics_python
 from flask import Flask, jsonify, request
@@ -12,18 +11,43 @@ APP_ID = "698945534e2e268ff3a49d5b"
 API_KEY = "BnlVMoYwk8ikSahocPx5"
 APP_NAME = "Hello, bHaptics!"
 MOTOR_LEN = 32
+MAX_INFLIGHT_DOTS = 2
+# While beats keep failing or being dropped, log the first one of the streak
+# and then every Nth, so a stuck SDK does not print on every beat.
+DOT_LOG_EVERY = 32
 
 app = Flask(__name__)
 
 
 class HapticController:
+    __slots__ = (
+        "loop",
+        "thread",
+        "initialized",
+        "pattern_handle",
+        "dot_tasks",
+        "_dropped_dots",
+        "_failed_dots",
+        "_dot_values",
+        "_beat_interval",
+        "_next_tick",
+    )
+
     def __init__(self) -> None:
         self.loop = asyncio.new_event_loop()
         self.thread = threading.Thread(target=self._run_loop, daemon=True)
         self.thread.start()
 
         self.initialized = False
-        self.pattern_task: asyncio.Task | None = None
+        self.pattern_handle: asyncio.TimerHandle | None = None
+        self.dot_tasks: set[asyncio.Task] = set()
+        self._dropped_dots = 0
+        self._failed_dots = 0
+        # Built once and shared by every beat; a tuple, so the SDK cannot
+        # mutate it between calls.
+        self._dot_values = (10,) * MOTOR_LEN
+        self._beat_interval = 0.0
+        self._next_tick = 0.0
 
     def _run_loop(self) -> None:
         asyncio.set_event_loop(self.loop)
@@ -37,44 +61,76 @@ class HapticController:
         print(f"Initialization result: {result}")
         self.initialized = True
 
-    async def _play_loop(self, bpm: int) -> None:
-        beat_interval = 60.0 / bpm
-        next_tick = time.perf_counter()
-
-        while True:
-            values = [10] * MOTOR_LEN
-            await bhaptics_python.play_dot(0, 100, values, -1)
-
-            next_tick += beat_interval
-            now = time.perf_counter()
-            sleep_time = next_tick - now
-
-            if sleep_time > 0:
-                await asyncio.sleep(sleep_time)
-            else:
-                while next_tick <= now:
-                    next_tick += beat_interval
-
-    async def _cancel_pattern_task(self) -> None:
-        if not self.pattern_task or self.pattern_task.done():
+    def _tick(self) -> None:
+        # Each beat is a timer callback that fires play_dot and re-arms itself
+        # on the loop clock; no coroutine frame or sleep future per beat.
+        if len(self.dot_tasks) < MAX_INFLIGHT_DOTS:
+            self._dropped_dots = 0
+            task = self.loop.create_task(
+                bhaptics_python.play_dot(0, 100, self._dot_values, -1)
+            )
+            self.dot_tasks.add(task)
+            task.add_done_callback(self._on_dot_done)
+        else:
+            # A slow SDK call costs this beat, not the cadence of the next.
+            self._dropped_dots += 1
+            if self._dropped_dots % DOT_LOG_EVERY == 1:
+                print(f"dropping beats: play_dot still in flight dropped={self._dropped_dots}")
+
+        beat_interval = self._beat_interval
+        self._next_tick += beat_interval
+        now = self.loop.time()
+        if self._next_tick <= now:
+            # Jump past every missed beat in one step after a stall.
+            self._next_tick += (
+                int((now - self._next_tick) // beat_interval) + 1
+            ) * beat_interval
+        self.pattern_handle = self.loop.call_at(self._next_tick, self._tick)
+
+    def _on_dot_done(self, task: asyncio.Task) -> None:
+        self.dot_tasks.discard(task)
+        if task.cancelled():
             return
-
-        self.pattern_task.cancel()
-        try:
-            await self.pattern_task
-        except asyncio.CancelledError:
-            pass
+        exc = task.exception()
+        if exc is None:
+            self._failed_dots = 0
+            return
+        self._failed_dots += 1
+        if self._failed_dots % DOT_LOG_EVERY == 1:
+            print(f"play_dot failed: {exc} failures={self._failed_dots}")
+
+    def _start_pattern(self) -> None:
+        # Fires the first beat right away, also when the BPM changes mid-run.
+        self._cancel_pattern()
+        self._next_tick = self.loop.time()
+        self._tick()
+
+    def _cancel_pattern(self) -> None:
+        if self.pattern_handle is not None:
+            self.pattern_handle.cancel()
+            self.pattern_handle = None
+
+    async def _cancel_dot_tasks(self) -> None:
+        tasks = list(self.dot_tasks)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
 
     async def _set_bpm_async(self, bpm: int) -> None:
         if bpm <= 0:
             raise ValueError("bpm must be a positive integer")
 
         await self._initialize()
-        await self._cancel_pattern_task()
-        self.pattern_task = self.loop.create_task(self._play_loop(bpm))
+        self._beat_interval = 60.0 / bpm
+        self._start_pattern()
 
     async def _stop_async(self) -> None:
-        await self._cancel_pattern_task()
+        self._cancel_pattern()
+        await self._cancel_dot_tasks()
         if self.initialized:
             await bhaptics_python.stop_all()
 
@@ -111,6 +167,17 @@ atexit.register(controller.close)
 
 
 def _extract_bpm() -> int:
+    if request.mimetype in ("", "text/plain"):
+        # Such a body is neither JSON nor form data, so only the query string
+        # outranks it; int() parses the raw bytes without decoding them.
+        query_bpm = request.args.get("bpm")
+        if query_bpm is not None:
+            return int(query_bpm)
+        raw_body = request.get_data().strip()
+        if raw_body:
+            return int(raw_body)
+        raise ValueError("missing bpm")
+
     if request.is_json:
         payload = request.get_json(silent=True) or {}
         if "bpm" in payload:
@@ -124,7 +191,7 @@ def _extract_bpm() -> int:
     if query_bpm is not None:
         return int(query_bpm)
 
-    raw_body = request.get_data(as_text=True).strip()
+    raw_body = request.get_data().strip()
     if raw_body:
         return int(raw_body)
 
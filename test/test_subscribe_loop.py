@@ -0,0 +1,46 @@
+import asyncio
+import socket
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+try:
+    import subscribe
+except ModuleNotFoundError as exc:  # paho-mqtt not installed
+    subscribe = None
+    _IMPORT_ERROR = exc
+else:
+    _IMPORT_ERROR = None
+
+
+@unittest.skipIf(subscribe is None, f"subscribe.py not importable: {_IMPORT_ERROR}")
+class SharedLoopTest(unittest.TestCase):
+    def test_shared_loop_supports_socket_readers(self) -> None:
+        # AsyncioMqttDriver registers the paho socket with add_reader and
+        # add_writer; a loop without them never reads the CONNACK.
+        loop, _thread = subscribe._shared_event_loop()
+        self.addCleanup(subscribe._shutdown_shared_loop)
+        left, right = socket.socketpair()
+        self.addCleanup(left.close)
+        self.addCleanup(right.close)
+
+        async def register() -> None:
+            loop.add_reader(left, lambda: None)
+            loop.add_writer(left, lambda: None)
+            loop.remove_writer(left)
+            loop.remove_reader(left)
+
+        future = asyncio.run_coroutine_threadsafe(register(), loop)
+        future.result(timeout=5.0)
+
+    def test_shutdown_stops_and_closes_the_shared_loop(self) -> None:
+        loop, thread = subscribe._shared_event_loop()
+        subscribe._shutdown_shared_loop()
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(loop.is_closed())
+
+
+if __name__ == "__main__":
+    unittest.main()